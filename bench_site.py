@@ -0,0 +1,232 @@
+import os
+import io
+import sys
+import json
+import time
+import zlib
+import random
+import struct
+import shutil
+import argparse
+import datetime
+import platform
+import resource
+import tempfile
+import contextlib
+import subprocess
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import update_site
+
+# Defaults describe a quick run; pass e.g. --dates 500 --tickers 500 for two years of six strategies
+DEFAULT_DATES = 20
+DEFAULT_TICKERS = 50
+DEFAULT_PLOTS = 20
+DEFAULT_PADDING = 0
+DEFAULT_SEED = 1
+RESULTS_FILE = "bench_results.json"
+
+# Values for the synthetic "str" columns, per column name
+STRING_VALUES = {
+    "Signal": ["BUY", "SELL", "HOLD"],
+    "Metric_Type": ["Sharpe", "Sortino", "Calmar"],
+    "action": ["BUY", "SELL", "HOLD", "WATCH"],
+    "rsi_status": ["Overbought", "Oversold", "Neutral"],
+    "macd_crossover": ["Bullish", "Bearish", "None"],
+    "trend": ["Uptrend", "Downtrend", "Sideways"]
+}
+
+def png_bytes(serial):
+    """Returns a valid 1x1 PNG whose pixel colour encodes serial, so every synthetic plot is distinct"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    pixel = b"\x00" + (serial & 0xFFFFFF).to_bytes(3, "big")
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(pixel)) + chunk(b"IEND", b""))
+
+def synthetic_row(strategy, ticker, rng, padding):
+    """Builds one output.json row carrying every column the history store reads for the strategy"""
+    row = {"ticker" if strategy == "pv" else "Ticker": ticker}
+    for name, path, kind in update_site.HISTORY_FIELDS[strategy]:
+        value = rng.choice(STRING_VALUES.get(name, ["A", "B"])) if kind == "str" else round(rng.uniform(-100, 100), 4)
+        target = row
+        for key in path[:-1]:
+            target = target.setdefault(key, {})
+        target[path[-1]] = value
+    if padding:
+        row["notes"] = "x" * padding
+    return row
+
+def synthetic_output(strategy, tickers, rng, padding):
+    """Builds a whole output.json in the layout the strategy uses"""
+    rows = [synthetic_row(strategy, ticker, rng, padding) for ticker in tickers]
+    if strategy == "m":
+        return {"scan_results": rows, "historical_context": {row["Ticker"]: {"Trend": "Up"} for row in rows}}
+    return rows
+
+def plot_names(strategy, tickers, count):
+    """Spreads count plots over the forward/backward/output folders, named the way the strategies name them"""
+    names = []
+    for i in range(count):
+        ticker = tickers[i % len(tickers)]
+        if strategy == "m":
+            names.append(("output", f"{ticker}_livetest.png"))
+        elif i % 2:
+            names.append(("backward", f"{ticker}_backtest.png"))
+        else:
+            names.append(("forward", f"forward_test_{ticker}.png"))
+    return names
+
+def generate_tree(root, strategies, dates, tickers, plots, padding, seed):
+    """Writes the synthetic strategy/date tree under root; returns (file count, total bytes)"""
+    rng = random.Random(seed)
+    universe = [f"T{i:04d}" for i in range(tickers)]
+    day = datetime.date(2024, 1, 1)
+    date_names = []
+    while len(date_names) < dates:
+        if day.weekday() < 5:
+            date_names.append(day.isoformat())
+        day += datetime.timedelta(days=1)
+
+    files = 0
+    size = 0
+    serial = 0
+    for strategy in strategies:
+        for date_name in date_names:
+            folder = os.path.join(root, strategy, date_name)
+            for sub in update_site.DATE_SUBFOLDERS:
+                os.makedirs(os.path.join(folder, sub), exist_ok=True)
+            data = json.dumps(synthetic_output(strategy, universe, rng, padding)).encode()
+            with open(os.path.join(folder, "output", "output.json"), "wb") as f:
+                f.write(data)
+            files += 1
+            size += len(data)
+            for sub, name in plot_names(strategy, universe, plots):
+                serial += 1
+                data = png_bytes(serial)
+                with open(os.path.join(folder, sub, name), "wb") as f:
+                    f.write(data)
+                files += 1
+                size += len(data)
+    return files, size
+
+def measure(name, func, verbose=False, trace_memory=False):
+    """Runs one phase under the build's own profiler and returns its wall/CPU time, file-system activity
+    and memory figures, with the profiler's per-stage breakdown of the phase under stages"""
+    profiler = update_site.PROFILER
+    first = len(profiler.phases)
+    if trace_memory:
+        tracemalloc.start()
+    cpu = time.process_time()
+    with contextlib.redirect_stdout(sys.stdout if verbose else io.StringIO()), profiler.phase(name):
+        func()
+    cpu = time.process_time() - cpu
+    # The enclosing phase finishes last, after any phases the build recorded inside it
+    *stages, metrics = profiler.phases[first:]
+    metrics = dict(metrics)
+    result = {"phase": metrics.pop("phase"), "wall_s": metrics.pop("seconds"), "cpu_s": round(cpu, 4)}
+    if trace_memory:
+        result["py_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    result.update(metrics)
+    # ru_maxrss is the high-water mark of the whole run so far (KiB on Linux)
+    result["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if stages:
+        result["stages"] = stages
+    return result
+
+def run_phases(threads, verbose, trace_memory):
+    """Times each build phase in the current directory, cold first and then against the warm cache"""
+    phases = [
+        ("scan (cold)", lambda: update_site.generate_manifest(use_cache=False, threads=threads)),
+        ("scan (warm)", lambda: update_site.generate_manifest(use_cache=True, threads=threads)),
+        ("manifest stages (cold)", lambda: update_site.generate_manifest(use_cache=True, threads=threads, stages=update_site.manifest_stages())),
+        # Outputs written into the date folders change their mtimes, so the next build rescans them once
+        ("manifest stages (rescan)", lambda: update_site.generate_manifest(use_cache=True, threads=threads, stages=update_site.manifest_stages())),
+        ("manifest stages (warm)", lambda: update_site.generate_manifest(use_cache=True, threads=threads, stages=update_site.manifest_stages())),
+        ("cache headers", update_site.generate_cache_headers),
+        ("legal pages", update_site.generate_legal_pages),
+        ("app shell", update_site.generate_app_shell)
+    ]
+    return [measure(name, func, verbose, trace_memory) for name, func in phases]
+
+def git_commit():
+    """Returns the commit of the checkout being benchmarked, if it is a git repository"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_file):
+    """Prints each phase's wall time against a previous results file"""
+    with open(baseline_file) as f:
+        baseline = {phase["phase"]: phase for phase in json.load(f)["phases"]}
+    print(f"Compared with {baseline_file}:")
+    for phase in results["phases"]:
+        old = baseline.get(phase["phase"])
+        if old and old["wall_s"]:
+            print(f"  {phase['phase']:<24} {old['wall_s']:>9.3f}s -> {phase['wall_s']:>9.3f}s ({phase['wall_s'] / old['wall_s']:.2f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks update_site.py against a synthetic strategy tree")
+    parser.add_argument("--strategies", nargs="+", default=update_site.STRATEGIES, choices=update_site.STRATEGIES,
+                        help="strategies to generate (default: all)")
+    parser.add_argument("--dates", type=int, default=DEFAULT_DATES,
+                        help=f"trading days per strategy (default: {DEFAULT_DATES})")
+    parser.add_argument("--tickers", type=int, default=DEFAULT_TICKERS,
+                        help=f"rows per output.json (default: {DEFAULT_TICKERS})")
+    parser.add_argument("--plots", type=int, default=DEFAULT_PLOTS,
+                        help=f"PNG files per date (default: {DEFAULT_PLOTS})")
+    parser.add_argument("--padding", type=int, default=DEFAULT_PADDING,
+                        help="extra bytes per row, to grow output.json without adding tickers")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="seed for the synthetic values")
+    parser.add_argument("--threads", type=int, default=update_site.SCAN_THREADS,
+                        help=f"scan threads passed to generate_manifest (default: {update_site.SCAN_THREADS})")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also record peak Python allocations per phase (tracemalloc; slows the run)")
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic tree and print its location")
+    parser.add_argument("--verbose", action="store_true", help="show the build's own output")
+    parser.add_argument("--output", default=RESULTS_FILE, help=f"results file (default: {RESULTS_FILE})")
+    parser.add_argument("--compare", metavar="RESULTS", help="print wall-time ratios against an earlier results file")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    root = tempfile.mkdtemp(prefix="bench_site_")
+    cwd = os.getcwd()
+    try:
+        print(f"Generating {len(args.strategies)} strategies x {args.dates} dates x {args.tickers} tickers in {root}...")
+        started = time.perf_counter()
+        files, size = generate_tree(root, args.strategies, args.dates, args.tickers, args.plots, args.padding, args.seed)
+        print(f"Generated {files:,} files ({size:,} bytes) in {time.perf_counter() - started:.1f}s")
+
+        update_site.PROFILER.start()
+        os.chdir(root)
+        phases = run_phases(args.threads, args.verbose, args.trace_memory)
+    finally:
+        os.chdir(cwd)
+        if args.keep:
+            print(f"Kept the synthetic tree in {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: getattr(args, key) for key in ("strategies", "dates", "tickers", "plots", "padding", "seed", "threads")},
+        "tree": {"files": files, "bytes": size},
+        "phases": phases
+    }
+    for phase in phases:
+        print(f"  {phase['phase']:<24} {phase['wall_s']:>9.3f}s  {phase['files_opened']:>7} files  {phase['dirs_visited']:>6} dirs  "
+              f"{phase['max_rss_kb'] // 1024:>5} MiB peak RSS")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved results to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+// Generated by update_site.py -- do not edit.
+// DMA family: every output.json column but the excluded ones, in file order
+import { enhanceSummaryTable, renderTable } from "./table.js?v=506ef8b488929281";
+
+const COLUMNS = {};
+
+export function enhance(summaryDiv, dateItem) {
+    enhanceSummaryTable(summaryDiv, dateItem, COLUMNS);
+}
+
+export function render(summaryDiv, json, dateItem, shell) {
+    renderTable(summaryDiv, json, dateItem, COLUMNS, shell);
+}
@@ -0,0 +1,48 @@
+// Generated by update_site.py -- do not edit.
+// Momentum (US): the summary plots, then one card per scanned ticker with its table and livetest plot.
+import { tableHtml } from "./table.js?v=506ef8b488929281";
+
+export function render(summaryDiv, json, dateItem, shell) {
+    const pictureHtml = shell.pictureHtml;
+    let mHtml = "";
+    
+    const scanSummaryImg = dateItem.output_images && dateItem.output_images.find(img => img.includes("scan_results_summary.png"));
+    const histSummaryImg = dateItem.output_images && dateItem.output_images.find(img => img.includes("historical_context_summary.png"));
+    
+    if (scanSummaryImg || histSummaryImg) {
+        mHtml += '<div class="gallery-grid">';
+        if (scanSummaryImg) mHtml += `<div class="gallery-item">${pictureHtml(scanSummaryImg, dateItem, "Scan Results Summary")}</div>`;
+        if (histSummaryImg) mHtml += `<div class="gallery-item">${pictureHtml(histSummaryImg, dateItem, "Historical Context Summary")}</div>`;
+        mHtml += '</div><hr>';
+    }
+    
+    const scanResults = json.scan_results || [];
+    const histContext = json.historical_context || {};
+    
+    if (scanResults.length > 0) {
+        mHtml += '<h3>Ticker Data</h3>';
+        scanResults.forEach(item => {
+            const ticker = item.Ticker;
+            mHtml += `<div class="w3-card w3-margin-bottom w3-padding">`;
+            mHtml += `<h4><b>${ticker}</b></h4>`;
+            mHtml += '<div class="w3-row-padding">';
+            mHtml += '<div class="w3-twothird" style="overflow-x:auto;">';
+            const tickerHist = histContext[ticker] || {};
+            const mergedData = { ...item, ...tickerHist };
+            mHtml += tableHtml([mergedData], {});
+            mHtml += '</div>';
+            mHtml += '<div class="w3-third">';
+            const livetestImg = dateItem.output_images && dateItem.output_images.find(img => img.includes(`${ticker}_livetest.png`));
+            if (livetestImg) {
+                mHtml += `<div class="gallery-item">${pictureHtml(livetestImg, dateItem, `${ticker} Livetest`, true, "max-width:100%")}</div>`;
+            } else {
+                mHtml += `<p>No plot available for ${ticker}.</p>`;
+            }
+            mHtml += '</div></div></div>';
+        });
+    } else {
+        mHtml += "<p>No data found.</p>";
+    }
+    summaryDiv.innerHTML = mHtml;
+    shell.observeLazyImages(summaryDiv);
+}
@@ -0,0 +1,18 @@
+// Generated by update_site.py -- do not edit.
+// Peak Valley (US): a fixed set of columns, the secondary ones hidden on small screens
+import { enhanceSummaryTable, renderTable } from "./table.js?v=506ef8b488929281";
+
+const COLUMNS = {
+    excluded: ["performance", "volatility"],
+    headerMap: {"ticker": "Ticker", "current_price": "Current Price", "rsi": "RSI", "macd": "MACD", "trend": "Trend", "mtf_trend": "MTF Trend", "adx": "ADX", "divergence": "Divergence", "stops": "Stops", "action": "Action", "reasons": "Reasons"},
+    alwaysVisible: ["ticker", "current_price", "stops", "action"],
+    actionColumn: "action"
+};
+
+export function enhance(summaryDiv, dateItem) {
+    enhanceSummaryTable(summaryDiv, dateItem, COLUMNS);
+}
+
+export function render(summaryDiv, json, dateItem, shell) {
+    renderTable(summaryDiv, json, dateItem, COLUMNS, shell);
+}
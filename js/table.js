@@ -0,0 +1,304 @@
+// Generated by update_site.py -- do not edit.
+// Summary tables shared by the strategy renderers. Column headers, classes and cell formatters are worked out
+// once per column. Rows are built in chunks through a DocumentFragment, and long tables keep only the rows in
+// view in the DOM.
+const TABLE_EXCLUDED_COLUMNS = ["Model", "Strategy", "Best_Window", "Metric_Value", "Metric_Type", "Sentiment_Score", "timestamp"];
+const HEADER_OVERRIDES = {"ticker": "Ticker", "current_price": "Current Price", "rsi": "RSI", "macd": "MACD", "mtf_trend": "MTF Trend", "adx": "ADX"};
+const VIRTUAL_ROW_THRESHOLD = 100; // Longer tables render only the visible rows
+const RENDER_CHUNK_ROWS = 50;
+const VIRTUAL_OVERSCAN_ROWS = 10;
+
+function stopsText(val) {
+    const sl = val.stop_loss ? val.stop_loss.toFixed(2) : 'N/A';
+    const tp = val.take_profit ? val.take_profit.toFixed(2) : 'N/A';
+    const slPct = val.stop_loss_pct ? `(${val.stop_loss_pct.toFixed(0)})` : '';
+    const tpPct = val.take_profit_pct ? `(${val.take_profit_pct.toFixed(0)})` : '';
+    return `SL ${slPct}: ${sl} | TP ${tpPct}: ${tp}`;
+}
+
+// Unwraps nested indicator objects to the value shown in the cell
+function cellValueGetter(key) {
+    switch (key) {
+        case 'rsi':
+        case 'trend':
+        case 'mtf_trend':
+        case 'adx':
+            return val => (val && typeof val === 'object' && val.status) ? val.status : val;
+        case 'macd':
+            return val => (val && typeof val === 'object' && val.crossover) ? val.crossover : val;
+        case 'divergence':
+            return val => (val && typeof val === 'object') ? (val.bullish ? "Bullish" : val.bearish ? "Bearish" : "None") : val;
+        case 'stops':
+            return val => (val && typeof val === 'object') ? stopsText(val) : val;
+        default:
+            return val => val;
+    }
+}
+
+// config (all optional): excluded columns on top of TABLE_EXCLUDED_COLUMNS, a headerMap fixing the columns
+// and their labels, the alwaysVisible columns (the rest hide on small screens) and an actionColumn to colour
+function buildColumns(rows, config) {
+    const excluded = TABLE_EXCLUDED_COLUMNS.concat(config.excluded || []);
+    const headerMap = config.headerMap;
+    const headers = headerMap ? Object.keys(headerMap) : Object.keys(rows[0]).filter(h => !excluded.includes(h));
+    
+    return headers.map(h => {
+        const key = h.toLowerCase();
+        const getValue = cellValueGetter(key);
+        const signalCell = h === 'Signal';
+        const actionCell = key === config.actionColumn;
+        return {
+            key: h,
+            label: (headerMap && headerMap[h]) || HEADER_OVERRIDES[key] || h.replace(/_/g, " "),
+            cls: (config.alwaysVisible && !config.alwaysVisible.includes(key)) ? "w3-hide-small" : "",
+            format: raw => {
+                let val = getValue(raw);
+                if (Array.isArray(val)) val = val.join(', ');
+                if (signalCell && val) val = `<span class="signal-${val}">${val}</span>`;
+                if (actionCell && val) {
+                    const signalClass = val.split(' ')[0].replace(/[^a-zA-Z]/g, ''); // Extract BUY from BUY (VOL BLOCKED)
+                    val = `<span class="signal-${signalClass}">${val}</span>`;
+                }
+                if (val === null || val === undefined) return "";
+                if (typeof val === 'object') return JSON.stringify(val); // Fallback to avoid [object Object]
+                if (typeof val === 'number') return val.toFixed(2);
+                return String(val);
+            },
+            sortKey: raw => {
+                let val = getValue(raw);
+                if (typeof val === 'number') return val;
+                if (Array.isArray(val)) val = val.join(', ');
+                if (val === null || val === undefined) return "";
+                return (typeof val === 'object' ? JSON.stringify(val) : String(val)).toLowerCase();
+            }
+        };
+    });
+}
+
+function rowCellsHtml(columns, row) {
+    let html = "";
+    for (const col of columns) {
+        html += col.cls ? `<td class="${col.cls}">${col.format(row[col.key])}</td>` : `<td>${col.format(row[col.key])}</td>`;
+    }
+    return html;
+}
+
+// Static table markup (used for the small per-ticker tables of the Momentum strategy)
+export function tableHtml(rows, config) {
+    if (!rows || rows.length === 0) return "<p>No data available.</p>";
+    const columns = buildColumns(rows, config);
+    const head = columns.map(c => c.cls ? `<th class="${c.cls}">${c.label}</th>` : `<th>${c.label}</th>`).join('');
+    const body = rows.map(row => `<tr>${rowCellsHtml(columns, row)}</tr>`).join('');
+    return `<table class="analysis-table w3-table-all w3-hoverable"><thead><tr class="w3-light-grey">${head}</tr></thead><tbody>${body}</tbody></table>`;
+}
+
+function compareKeys(a, b) {
+    if (typeof a === typeof b) return a < b ? -1 : a > b ? 1 : 0;
+    return typeof a === 'number' ? -1 : 1; // Numbers before text
+}
+
+// Interactive table with client-side sort (click a header) and filter; no full rebuilds
+export function mountDataTable(container, rows, config, initial) {
+    if (!rows || rows.length === 0) {
+        container.innerHTML = "<p>No data available.</p>";
+        return;
+    }
+    const columns = buildColumns(rows, config);
+    const virtual = rows.length > VIRTUAL_ROW_THRESHOLD;
+    const rowHtml = new Array(rows.length);   // Cell markup, built the first time a row is shown
+    const sortKeys = new Array(columns.length); // Per-column sort keys, built on first sort
+    let rowText = null;                       // Plain row text for filtering, built on first filter
+    let view = rows.map((_, i) => i);
+    let sortCol = -1, sortDir = 1, filterText = "";
+    let rowHeight = 0, renderToken = 0, scrollPending = false;
+    
+    const toolbar = document.createElement("div");
+    toolbar.className = "table-toolbar";
+    const filterInput = document.createElement("input");
+    filterInput.className = "w3-input w3-border w3-small";
+    filterInput.type = "search";
+    filterInput.placeholder = "Filter rows...";
+    filterInput.setAttribute("aria-label", "Filter rows");
+    const counter = document.createElement("span");
+    counter.className = "w3-small w3-text-grey";
+    toolbar.append(filterInput, counter);
+    
+    const scroller = document.createElement("div");
+    scroller.className = virtual ? "table-scroll" : "";
+    scroller.style.overflowX = "auto";
+    const table = document.createElement("table");
+    table.className = "analysis-table w3-table-all w3-hoverable" + (virtual ? " virtual" : "");
+    const thead = document.createElement("thead");
+    const headRow = document.createElement("tr");
+    headRow.className = "w3-light-grey";
+    const headCells = columns.map((col, i) => {
+        const th = document.createElement("th");
+        if (col.cls) th.className = col.cls;
+        th.innerHTML = col.label;
+        th.title = "Sort";
+        th.onclick = () => sortBy(i);
+        headRow.appendChild(th);
+        return th;
+    });
+    thead.appendChild(headRow);
+    const tbody = document.createElement("tbody");
+    table.append(thead, tbody);
+    scroller.appendChild(table);
+    
+    function rowElement(i) {
+        const tr = document.createElement("tr");
+        tr.innerHTML = rowHtml[i] || (rowHtml[i] = rowCellsHtml(columns, rows[i]));
+        return tr;
+    }
+    
+    function spacer(height) {
+        const tr = document.createElement("tr");
+        tr.className = "table-spacer";
+        tr.innerHTML = `<td colspan="${columns.length}" style="height:${height}px"></td>`;
+        return tr;
+    }
+    
+    // Short tables: append every row, one chunk per animation frame
+    function renderAll() {
+        const token = ++renderToken;
+        tbody.textContent = "";
+        let start = 0;
+        (function chunk() {
+            if (token !== renderToken) return;
+            const frag = document.createDocumentFragment();
+            const end = Math.min(start + RENDER_CHUNK_ROWS, view.length);
+            for (let i = start; i < end; i++) frag.appendChild(rowElement(view[i]));
+            tbody.appendChild(frag);
+            start = end;
+            if (start < view.length) requestAnimationFrame(chunk);
+        })();
+    }
+    
+    // Long tables: only the rows inside the scroll viewport (plus overscan) are in the DOM
+    function renderWindow() {
+        scrollPending = false;
+        if (!rowHeight) {
+            tbody.textContent = "";
+            if (view.length === 0) return;
+            tbody.appendChild(rowElement(view[0]));
+            rowHeight = tbody.firstChild.getBoundingClientRect().height || 40;
+        }
+        const first = Math.max(0, Math.floor(scroller.scrollTop / rowHeight) - VIRTUAL_OVERSCAN_ROWS);
+        const count = Math.ceil(scroller.clientHeight / rowHeight) + 2 * VIRTUAL_OVERSCAN_ROWS;
+        const last = Math.min(view.length, first + count);
+        const frag = document.createDocumentFragment();
+        frag.appendChild(spacer(first * rowHeight));
+        for (let i = first; i < last; i++) frag.appendChild(rowElement(view[i]));
+        frag.appendChild(spacer((view.length - last) * rowHeight));
+        tbody.textContent = "";
+        tbody.appendChild(frag);
+    }
+    
+    function render() {
+        counter.textContent = `${view.length} of ${rows.length} rows`;
+        if (virtual) {
+            scroller.scrollTop = 0;
+            renderWindow();
+        } else {
+            renderAll();
+        }
+    }
+    
+    function refresh() {
+        view = rows.map((_, i) => i);
+        if (filterText) {
+            if (!rowText) {
+                rowText = rows.map(row => columns.map(c => c.format(row[c.key])).join(" ").replace(/<[^>]*>/g, "").toLowerCase());
+            }
+            view = view.filter(i => rowText[i].includes(filterText));
+        }
+        if (sortCol >= 0) {
+            const col = columns[sortCol];
+            const keys = sortKeys[sortCol] || (sortKeys[sortCol] = rows.map(row => col.sortKey(row[col.key])));
+            view.sort((a, b) => compareKeys(keys[a], keys[b]) * sortDir || a - b);
+        }
+        render();
+    }
+    
+    function sortBy(i) {
+        sortDir = sortCol === i ? -sortDir : 1;
+        sortCol = i;
+        headCells.forEach((th, j) => th.innerHTML = columns[j].label + (j === i ? (sortDir > 0 ? " &#9650;" : " &#9660;") : ""));
+        refresh();
+    }
+    
+    let filterTimer = null;
+    filterInput.oninput = () => {
+        clearTimeout(filterTimer);
+        filterTimer = setTimeout(() => {
+            filterText = filterInput.value.trim().toLowerCase();
+            refresh();
+        }, 150);
+    };
+    if (virtual) {
+        scroller.addEventListener("scroll", () => {
+            if (!scrollPending) {
+                scrollPending = true;
+                requestAnimationFrame(renderWindow);
+            }
+        }, { passive: true });
+    }
+    
+    container.textContent = "";
+    container.append(toolbar, scroller);
+    if (initial && initial.filter) {
+        filterInput.value = initial.filter;
+        filterText = initial.filter.trim().toLowerCase();
+    }
+    if (initial && initial.sortCol >= 0) sortBy(initial.sortCol);
+    else refresh();
+    if (initial && initial.focusFilter) filterInput.focus();
+}
+
+// The pre-rendered table paints first; sorting or filtering swaps in the interactive table
+export function enhanceSummaryTable(summaryDiv, dateItem, config) {
+    const table = summaryDiv.querySelector("table.analysis-table");
+    if (!table || !dateItem.output_file) return;
+    
+    const host = document.createElement("div");
+    table.replaceWith(host);
+    const toolbar = document.createElement("div");
+    toolbar.className = "table-toolbar";
+    toolbar.innerHTML = '<input class="w3-input w3-border w3-small" type="search" placeholder="Filter rows..." aria-label="Filter rows">';
+    host.append(toolbar, table);
+    
+    // Input typed or sorts clicked while the data loads are carried over to the interactive table
+    const filterInput = toolbar.querySelector("input");
+    let pendingSort = -1;
+    let upgrading = null;
+    const upgrade = () => {
+        if (upgrading) return;
+        upgrading = fetch(dateItem.output_file).then(res => res.json()).then(json => {
+            const rows = Array.isArray(json) ? json : [json];
+            const focusFilter = document.activeElement === filterInput;
+            mountDataTable(host, rows, config, { filter: filterInput.value, sortCol: pendingSort, focusFilter: focusFilter });
+        }).catch(e => {
+            upgrading = null;
+            console.error("Failed to load table data", e);
+        });
+    };
+    
+    filterInput.oninput = upgrade;
+    table.querySelectorAll("th").forEach((th, i) => {
+        th.title = "Sort";
+        th.onclick = () => {
+            pendingSort = i;
+            upgrade();
+        };
+    });
+}
+
+// Summary built in the browser, for dates without a pre-rendered fragment
+export function renderTable(summaryDiv, json, dateItem, config, shell) {
+    // Handle array or single dict wrap
+    const data = Array.isArray(json) ? json : [json];
+    summaryDiv.innerHTML = shell.downloadLinkHtml(dateItem);
+    const host = document.createElement("div");
+    summaryDiv.appendChild(host);
+    mountDataTable(host, data, config);
+}
@@ -0,0 +1,71 @@
+// Generated by update_site.py -- do not edit.
+// Cache names carry the build version, so activating a new build evicts the old shell and data caches.
+const VERSION = "f4496fe1b35d1ef4";
+const SHELL_CACHE = `shell-${VERSION}`;
+const DATA_CACHE = `data-${VERSION}`;
+// Content-addressed (?v=<hash>) reports, shards, fragments and plots never change, so they outlive builds;
+// a new hash for the same path replaces the old entry instead.
+const ASSET_CACHE = "assets";
+const PRECACHE = ["./", "index.html", "privacy.html", "terms.html", "about.html", "contact.html"];
+
+self.addEventListener("install", event => {
+    event.waitUntil(caches.open(SHELL_CACHE).then(cache => cache.addAll(PRECACHE)).then(() => self.skipWaiting()));
+});
+
+self.addEventListener("activate", event => {
+    const keep = [SHELL_CACHE, DATA_CACHE, ASSET_CACHE];
+    event.waitUntil(caches.keys()
+        .then(names => Promise.all(names.filter(name => !keep.includes(name)).map(name => caches.delete(name))))
+        .then(() => self.clients.claim()));
+});
+
+// Shell: cache-first, falling back to the network for pages outside the precache
+async function shellFirst(request) {
+    const cached = await caches.match(request, { cacheName: SHELL_CACHE, ignoreSearch: true });
+    return cached || fetch(request);
+}
+
+// Hashed assets: cache-first; older versions of the same path are dropped when a new one is stored
+async function cacheFirst(request) {
+    const cache = await caches.open(ASSET_CACHE);
+    const cached = await cache.match(request);
+    if (cached) return cached;
+    const response = await fetch(request);
+    if (response.ok) {
+        const stale = await cache.keys(request, { ignoreSearch: true });
+        await Promise.all(stale.map(key => cache.delete(key)));
+        await cache.put(request, response.clone());
+    }
+    return response;
+}
+
+// Root manifest, search shards and CDN stylesheets: answer from cache, refresh in the background
+async function staleWhileRevalidate(event) {
+    const cache = await caches.open(DATA_CACHE);
+    const cached = await cache.match(event.request, { ignoreVary: true });
+    const refresh = fetch(event.request).then(response => {
+        if (response.ok || response.type === "opaque") cache.put(event.request, response.clone());
+        return response;
+    });
+    if (cached) {
+        event.waitUntil(refresh.catch(() => {}));
+        return cached;
+    }
+    return refresh;
+}
+
+self.addEventListener("fetch", event => {
+    const request = event.request;
+    // Range requests (plots inside archival packs) go straight to the network; partial responses cannot be cached
+    if (request.method !== "GET" || request.headers.has("range")) return;
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) {
+        event.respondWith(staleWhileRevalidate(event));
+    } else if (request.mode === "navigate" || PRECACHE.includes(url.pathname.split("/").pop() || "./")) {
+        event.respondWith(shellFirst(request));
+    } else if (url.searchParams.has("v")) {
+        event.respondWith(cacheFirst(request));
+    } else {
+        event.respondWith(staleWhileRevalidate(event));
+    }
+});
@@ -1,13 +1,257 @@
 
 import os
-import glob
+import re
+import sys
+import gzip
 import json
+import math
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+import hashlib
+import datetime
+import argparse
+import threading
+import cProfile
+import functools
+import contextlib
 import collections
+import http.server
+from array import array
+from urllib.parse import quote
+from decimal import Decimal, ROUND_HALF_UP
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:  # image optimization is optional
+    Image = None
+
+try:
+    import brotli
+except ImportError:  # Brotli sidecars are optional
+    brotli = None
 
 # Configuration
 STRATEGIES = ["dma", "dma_bo", "dma_hmm", "dma_hmm_bo", "pv", "m"]
 ROOT_DIR = "."
 
+# Build cache: per-date folder fingerprints and the manifest entries they produced.
+# Bump the version whenever the shape of a manifest entry or the pre-rendered HTML changes.
+# Entry keys starting with "_" are build bookkeeping and are kept out of the published shards.
+BUILD_CACHE_FILE = ".build_cache.json"
+BUILD_CACHE_VERSION = 3
+DATE_SUBFOLDERS = ["output", "forward", "backward"]
+
+# Manifest layout: a small root index (manifest.json) plus one shard per strategy/month
+MANIFEST_FILE = "manifest.json"
+MANIFEST_SHARD_DIR = "manifest"
+
+# Cache headers for static hosts that read a _headers file (Cloudflare Pages, Netlify).
+# Asset URLs carry a ?v=<content hash>, so everything but the root index and shell is immutable.
+HEADERS_FILE = "_headers"
+HASH_LENGTH = 16
+
+# --profile writes per-phase timings and file-system activity here for monitoring to track across builds
+BUILD_METRICS_FILE = "build_metrics.json"
+
+# Generated files are only rewritten when their content changes (see write_output); tallied for the run summary
+OUTPUT_STATS = collections.Counter()
+
+# Self-hosted styles: with copies of the CDN stylesheets saved under vendor/, every page gets one inlined
+# stylesheet holding only the w3.css rules and Font Awesome icons it uses (icons as CSS-masked SVGs).
+# vendor/w3.css is W3.CSS 4.15, the release the CDN link serves; vendor/fontawesome/svgs holds the SVGs of
+# the icons the pages use, so copy an icon's SVG from the same release there when a page starts using it.
+VENDOR_DIR = "vendor"
+W3CSS_URL = "https://www.w3schools.com/w3css/4/w3.css"
+W3CSS_SOURCE = os.path.join(VENDOR_DIR, "w3.css")
+FONTAWESOME_URL = "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css"
+ICON_SOURCE_DIR = os.path.join(VENDOR_DIR, "fontawesome", "svgs")  # svgs/ folder of the Font Awesome 6.4 free download
+ICON_STYLES = {"fa": "solid", "fa-solid": "solid", "fa-regular": "regular", "fa-brands": "brands"}
+ICON_MODIFIERS = ["fa-fw", "fa-spin"]
+# Font Awesome 6 names that only exist as aliases, without an SVG of their own
+ICON_ALIASES = {"home": "house"}
+# Where pages name their classes: class attributes, and the string literals JS assigns through
+# className, classList or a table column's cls. Selectors in <style> blocks are not uses.
+CLASS_ATTRIBUTE = re.compile(r"""\bclass\s*=\s*(["'])(.*?)\1""")
+CLASS_EXPRESSION = re.compile(r"\b(?:className\s*\+?=|cls\s*:|classList\.(?:add|remove|toggle|replace|contains)\()([^;\n]*)")
+STRING_LITERAL = re.compile(r"""(["'`])(.*?)\1""")
+ICON_BASE_CSS = (
+    "/* Font Awesome Free 6.4.0 by @fontawesome - https://fontawesome.com License - https://fontawesome.com/license/free */"
+    ".fa,.fa-solid,.fa-regular,.fa-brands{display:inline-block;width:1em;height:1em;vertical-align:-.125em;"
+    "background-color:currentColor;-webkit-mask:var(--fa) center/contain no-repeat;mask:var(--fa) center/contain no-repeat}"
+    ".fa-fw{width:1.25em}.fa-spin{animation:fa-spin 2s linear infinite}@keyframes fa-spin{to{transform:rotate(360deg)}}"
+)
+
+# Service worker written next to index.html; its cache names are versioned by a hash of the shell it precaches
+SERVICE_WORKER_FILE = "sw.js"
+
+# Image optimization (--images): variants are written next to each PNG as <name><suffix>.
+# Changing a size or quality setting should come with a new suffix so cached copies are not reused.
+THUMB_WIDTH = 640
+THUMB_SUFFIX = f".thumb{THUMB_WIDTH}.webp"
+WEBP_QUALITY = 82
+AVIF_QUALITY = 60
+
+# Contact sheets (--sprites): each date's forward and backward plots are tiled into a few WebP sheets,
+# sprites/<strategy>/<date>/<forward|backward>-<n>.webp, and the entry's "sprites" map gives every plot its sheet,
+# column and row, so a gallery takes one request per sheet instead of one per plot. Plots are scaled to fit
+# SPRITE_TILE and centred on white; lists shorter than SPRITE_MIN_PLOTS, or archived into packs, stay separate.
+# Each date's sheets.json keeps the key and map of its sheets, so an entry rebuilt by a rescan gets them back undrawn.
+SPRITE_DIR = "sprites"
+SPRITE_INDEX_FILE = "sheets.json"
+SPRITE_LISTS = ["forward_images", "backward_images"]
+SPRITE_TILE = (THUMB_WIDTH, 374)  # The 1200x700 plots at grid-thumbnail width
+SPRITE_COLUMNS = 4
+SPRITE_SHEET_TILES = 24
+SPRITE_MIN_PLOTS = 4
+
+# Content-addressed plot store (--dedupe): each distinct image is kept once as blobs/<content hash>/<file name>,
+# and date entries point there instead of at their own copies. The file name is kept because the shell
+# matches plots by name (<TICKER>_livetest.png, scan_results_summary.png, ...). Per-date copies replaced by
+# symlinks (--dedupe-links) are read-only: the blob is shared by every date holding that plot, so it is made
+# read-only too, and anything rewriting a linked plot must delete the link and write a new file.
+BLOB_DIR = "blobs"
+IMAGE_LISTS = ["forward_images", "backward_images", "output_images"]
+
+# Archival packs (--archive-after DAYS): plots of dates older than DAYS move into one pack per strategy/month,
+# packs/<strategy>/<YYYY-MM>.pack, next to a <YYYY-MM>.json index of [name, offset, length, content hash] per date
+# and image list. Manifest URLs then address a byte range, <pack>?v=<hash>#<first>-<last>/<file name>; reports
+# stay loose files. Packs only ever grow: a date stays listed as long as its pack holds it. The loose copies are
+# kept until --prune-archived deletes the ones whose content the pack holds.
+PACK_DIR = "packs"
+
+# Strict (no NaN/Infinity), minified copy of each output.json that the manifest points to
+NORMALIZED_OUTPUT = "output.min.json"
+
+# Pre-rendered summary table written next to each output.json
+SUMMARY_FRAGMENT = "summary.html"
+
+# Columns hidden from the summary tables
+TABLE_EXCLUDED_COLUMNS = ["Model", "Strategy", "Best_Window", "Metric_Value", "Metric_Type", "Sentiment_Score", "timestamp"]
+PV_EXCLUDED_COLUMNS = ["performance", "volatility"]
+
+# Header mapping and column selection for Peak Valley (US)
+PV_HEADER_MAP = {
+    "ticker": "Ticker",
+    "current_price": "Current Price",
+    "rsi": "RSI",
+    "macd": "MACD",
+    "trend": "Trend",
+    "mtf_trend": "MTF Trend",
+    "adx": "ADX",
+    "divergence": "Divergence",
+    "stops": "Stops",
+    "action": "Action",
+    "reasons": "Reasons"
+}
+PV_COLUMNS = list(PV_HEADER_MAP)
+PV_ALWAYS_VISIBLE = ["ticker", "current_price", "stops", "action"]
+HEADER_OVERRIDES = {
+    "ticker": "Ticker",
+    "current_price": "Current Price",
+    "rsi": "RSI",
+    "macd": "MACD",
+    "mtf_trend": "MTF Trend",
+    "adx": "ADX"
+}
+
+# Columnar history store: history/<strategy>.col holds every date's rows, one typed array per column.
+# Each column is (name, path into an output.json row, type); "str" columns are dictionary-encoded.
+# The stores are read only at build time, so they are git-ignored (and not deployed); a build rebuilds a missing one.
+HISTORY_DIR = "history"
+HISTORY_MAGIC = b"COLSTORE1\n"
+HISTORY_TYPECODES = {"str": "I", "f64": "d"}
+HISTORY_NULL_CODE = 0xFFFFFFFF
+DMA_HISTORY_FIELDS = [
+    ("Signal", ("Signal",), "str"),
+    ("Metric_Value", ("Metric_Value",), "f64"),
+    ("Metric_Type", ("Metric_Type",), "str"),
+    ("Best_Window", ("Best_Window",), "f64"),
+    ("Nominal_Buy", ("Nominal_Buy",), "f64"),
+    ("Aggressive_Buy", ("Aggressive_Buy",), "f64"),
+    ("Sentiment_Score", ("Sentiment_Score",), "f64")
+]
+HISTORY_FIELDS = {
+    "dma": DMA_HISTORY_FIELDS,
+    "dma_bo": DMA_HISTORY_FIELDS,
+    "dma_hmm": DMA_HISTORY_FIELDS,
+    "dma_hmm_bo": DMA_HISTORY_FIELDS,
+    "pv": [
+        ("action", ("action",), "str"),
+        ("current_price", ("current_price",), "f64"),
+        ("rsi", ("rsi", "current"), "f64"),
+        ("rsi_status", ("rsi", "status"), "str"),
+        ("macd", ("macd", "current"), "f64"),
+        ("macd_crossover", ("macd", "crossover"), "str"),
+        ("trend", ("trend", "status"), "str"),
+        ("adx", ("adx", "current"), "f64"),
+        ("stop_loss", ("stops", "stop_loss"), "f64"),
+        ("take_profit", ("stops", "take_profit"), "f64"),
+        ("stop_loss_pct", ("stops", "stop_loss_pct"), "f64"),
+        ("take_profit_pct", ("stops", "take_profit_pct"), "f64")
+    ],
+    "m": [
+        ("Price", ("Price",), "f64"),
+        ("Stop Loss Price", ("Stop Loss Price",), "f64"),
+        ("Take Profit Price", ("Take Profit Price",), "f64"),
+        ("RSI", ("RSI",), "f64"),
+        ("Alpha (%)", ("Alpha (%)",), "f64"),
+        ("Vol Exp (x)", ("Vol Exp (x)",), "f64"),
+        ("RS Rel Accel (%)", ("RS Rel Accel (%)",), "f64"),
+        ("% of Global Max", ("% of Global Max",), "f64")
+    ]
+}
+
+# Ingestion: each strategy's HISTORY_FIELDS double as the schema its output.json rows are validated against.
+# Parsed rows are cached by content hash (the ?v= of output_file) so unchanged files are never re-parsed;
+# bump the version when parse_output() changes.
+INGEST_CACHE_FILE = ".ingest_cache.json"
+INGEST_CACHE_VERSION = 1
+INGEST_MAX_ERRORS = 3  # Schema errors printed per file
+
+# Day-over-day changes: each date's records are compared with the previous date of the same strategy and
+# the differences written to output/changes.day.json; changes.json at the root is a rolling feed of the newest ones.
+# Per strategy: (signal column or None, level columns whose moves of CHANGE_THRESHOLD or more are listed)
+CHANGES_FILE = "changes.day.json"
+CHANGES_FEED_FILE = "changes.json"
+CHANGES_FEED_LENGTH = 30
+CHANGE_THRESHOLD = 0.05
+CHANGE_FIELDS = {
+    "dma": ("Signal", ["Aggressive_Buy", "Nominal_Buy"]),
+    "dma_bo": ("Signal", ["Aggressive_Buy", "Nominal_Buy"]),
+    "dma_hmm": ("Signal", ["Aggressive_Buy", "Nominal_Buy"]),
+    "dma_hmm_bo": ("Signal", ["Aggressive_Buy", "Nominal_Buy"]),
+    "pv": ("action", ["stop_loss", "take_profit"]),
+    "m": (None, ["Stop Loss Price", "Take Profit Price"])
+}
+
+# Inverted ticker index: search/<prefix>.json maps each ticker to its (strategy, date, signal, metric) postings.
+# Per strategy: (signal column, key metric column, metric label), taken from the columnar history.
+SEARCH_DIR = "search"
+SEARCH_POSTING_FIELDS = {
+    "dma": ("Signal", "Metric_Value", "Metric Value"),
+    "dma_bo": ("Signal", "Metric_Value", "Metric Value"),
+    "dma_hmm": ("Signal", "Metric_Value", "Metric Value"),
+    "dma_hmm_bo": ("Signal", "Metric_Value", "Metric Value"),
+    "pv": ("action", "current_price", "Current Price"),
+    "m": (None, "RS Rel Accel (%)", "RS Rel Accel (%)")
+}
+
+# Watch mode (--watch): bursts of writes are collected until WATCH_DEBOUNCE seconds pass without a new change
+# (at most WATCH_MAX_DELAY), then only the touched date folders are rescanned. WATCH_POLL_INTERVAL applies
+# where inotify is unavailable. --serve adds a preview server whose pages reload when a rebuild finishes.
+WATCH_DEBOUNCE = 2.0
+WATCH_MAX_DELAY = 30.0
+WATCH_POLL_INTERVAL = 2.0
+PREVIEW_PORT = 8000
+RELOAD_PATH = "/__reload"
+
+# Worker threads used to scan strategy and date folders (mostly waiting on I/O)
+SCAN_THREADS = 8
+
 # Descriptions for strategies
 STRATEGY_DESCRIPTIONS = {
     "dma": {
@@ -37,6 +281,20 @@ STRATEGY_DESCRIPTIONS = {
 }
 
 
+# Summary renderers of the app shell: ES modules written to js/ and imported the first time a strategy is opened,
+# so only the core (sidebar, manifest, galleries) is inlined for first paint. Each strategy names its module and
+# the plot tabs it shows; a new layout also adds its module source to generate_renderer_modules(). Modules are
+# handed the core helpers they use (downloadLinkHtml, pictureHtml, observeLazyImages) as render()'s shell argument.
+RENDERER_DIR = "js"
+STRATEGY_RENDERERS = {
+    "dma": {"module": "dma", "tabs": ["Forward"]},
+    "dma_bo": {"module": "dma", "tabs": ["Forward"]},
+    "dma_hmm": {"module": "dma", "tabs": ["Forward"]},
+    "dma_hmm_bo": {"module": "dma", "tabs": ["Forward"]},
+    "pv": {"module": "pv", "tabs": ["Forward", "Backward"]},
+    "m": {"module": "m", "tabs": ["Backward"]}
+}
+
 # Legal Page Content
 LEGAL_PAGES = {
     "privacy": {
@@ -80,7 +338,109 @@ LEGAL_PAGES = {
     }
 }
 
-def generate_legal_pages():
+def css_blocks(css):
+    """Splits a stylesheet into top-level (prelude, body) pairs; body is None for statements such as @import"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    blocks, depth, start, prelude = [], 0, 0, None
+    for i, ch in enumerate(css):
+        if ch == "{":
+            if depth == 0:
+                prelude, start = css[start:i].strip(), i + 1
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                blocks.append((prelude, css[start:i].strip()))
+                start = i + 1
+        elif ch == ";" and depth == 0:
+            blocks.append((css[start:i].strip(), None))
+            start = i + 1
+    return blocks
+
+def compact_css(body):
+    """Drops the optional whitespace from a declaration block"""
+    return re.sub(r"\s*([;:{},>])\s*", r"\1", re.sub(r"\s+", " ", body)).rstrip(";")
+
+def subset_css(css, tokens):
+    """Keeps the rules whose selectors only use classes found in tokens, and the keyframes those rules reference"""
+    rules, keyframes = [], []
+    for prelude, body in css_blocks(css):
+        if body is None:
+            continue
+        if prelude.startswith(("@keyframes", "@-webkit-keyframes")):
+            keyframes.append((prelude.split()[-1], f"{prelude}{{{compact_css(body)}}}"))
+        elif prelude.startswith("@"):
+            inner = subset_css(body, tokens)
+            if inner:
+                rules.append(f"{prelude}{{{inner}}}")
+        else:
+            selectors = [sel.strip() for sel in prelude.split(",")
+                         if set(re.findall(r"\.(-?[_a-zA-Z][\w-]*)", sel)) <= tokens]
+            if selectors:
+                rules.append(f"{','.join(selectors)}{{{compact_css(body)}}}")
+    kept = "".join(rules)
+    return kept + "".join(text for name, text in keyframes if name in kept)
+
+def icon_svg(name, styles):
+    """Returns the minified SVG for a Font Awesome icon, looking in the given style folders in order"""
+    for style in styles:
+        path = os.path.join(ICON_SOURCE_DIR, style, f"{ICON_ALIASES.get(name, name)}.svg")
+        if os.path.exists(path):
+            with open(path) as f:
+                return re.sub(r"\s+", " ", re.sub(r"<!--.*?-->", "", f.read(), flags=re.S)).strip()
+    return None
+
+def icon_css(tokens):
+    """CSS mask icons for the fa-* classes in tokens, or None if any icon is missing from ICON_SOURCE_DIR"""
+    styles = list(dict.fromkeys(style for cls, style in ICON_STYLES.items() if cls in tokens))
+    names = sorted(t[3:] for t in tokens if t.startswith("fa-") and t not in ICON_STYLES and t not in ICON_MODIFIERS)
+    rules = [ICON_BASE_CSS]
+    for name in names:
+        svg = icon_svg(name, styles)
+        if svg is None:
+            print(f"  fa-{name} not found under {ICON_SOURCE_DIR}, keeping the Font Awesome stylesheet")
+            return None
+        data = quote(svg.replace('"', "'"), safe=" /=:;,.'-")
+        rules.append(f'.fa-{name}{{--fa:url("data:image/svg+xml,{data}")}}')
+    return "".join(rules)
+
+def load_vendor_styles():
+    """Reads the vendored w3.css and checks for the Font Awesome SVGs; None if neither is available"""
+    w3css = None
+    if os.path.exists(W3CSS_SOURCE):
+        with open(W3CSS_SOURCE) as f:
+            w3css = f.read()
+    icons = os.path.isdir(ICON_SOURCE_DIR)
+    if w3css is None and not icons:
+        print(f"Skipped style subsetting (nothing vendored under {VENDOR_DIR}/), pages keep the CDN stylesheets")
+        return None
+    return {"w3css": w3css, "icons": icons}
+
+def class_tokens(text):
+    """Returns the class names a page or script uses"""
+    values = [value for _, value in CLASS_ATTRIBUTE.findall(text)]
+    for expression in CLASS_EXPRESSION.findall(text):
+        values += [value for _, value in STRING_LITERAL.findall(expression)]
+    return {token for value in values for token in value.split() if re.fullmatch(r"-?[_a-zA-Z][\w-]*", token)}
+
+def inline_styles(html, vendor_styles, scripts=()):
+    """Replaces a page's CDN stylesheet links with one inlined stylesheet subset to the classes it uses
+    scripts: sources of modules the page loads later, whose classes need the same rules"""
+    if not vendor_styles:
+        return html
+    tokens = class_tokens(html).union(*map(class_tokens, scripts))
+    css = []
+    if vendor_styles["w3css"] is not None:
+        css.append(subset_css(vendor_styles["w3css"], tokens))
+        html = re.sub(rf'\s*<link rel="stylesheet" href="{re.escape(W3CSS_URL)}">', "", html)
+    icons = icon_css(tokens) if vendor_styles["icons"] else None
+    if icons is not None:
+        css.append(icons)
+        html = re.sub(rf'\s*(<!-- FontAwesome 6 -->\s*)?<link rel="stylesheet" href="{re.escape(FONTAWESOME_URL)}">', "", html)
+    # Ahead of the page's own <style>, where the links were, so page rules still win
+    return html.replace("<style>", f"<style>{''.join(css)}</style>\n    <style>", 1)
+
+def generate_legal_pages(vendor_styles=None):
     """Generates static legal pages"""
     template = """<!DOCTYPE html>
 <html lang="en">
@@ -94,95 +454,1977 @@ def generate_legal_pages():
 </head>
 <body class="w3-light-grey">
 
-<div class="w3-bar w3-black w3-large">
-  <a href="index.html" class="w3-bar-item w3-button"><i class="fa-solid fa-home"></i> Home</a>
-  <span class="w3-bar-item w3-right">Stock Market Analysis</span>
-</div>
+<div class="w3-bar w3-black w3-large">
+  <a href="index.html" class="w3-bar-item w3-button"><i class="fa-solid fa-home"></i> Home</a>
+  <span class="w3-bar-item w3-right">Stock Market Analysis</span>
+</div>
+
+<div class="w3-content w3-white w3-card w3-padding-large" style="max-width:800px;margin-top:20px;margin-bottom:20px">
+    <h1>{title}</h1>
+    <hr>
+    {content}
+</div>
+
+<footer class="w3-container w3-padding-16 w3-center w3-light-grey">
+    <p><a href="index.html">Home</a> | <a href="privacy.html">Privacy</a> | <a href="terms.html">Terms</a> | <a href="about.html">About</a> | <a href="contact.html">Contact</a></p>
+</footer>
+
+</body>
+</html>
+"""
+    for page, data in LEGAL_PAGES.items():
+        html = inline_styles(template.format(title=data["title"], content=data["content"]), vendor_styles)
+        write_output(f"{page}.html", html)
+    print("Generated legal pages")
+
+def load_build_cache():
+    """Loads the per-date fingerprint cache, or an empty one if missing or outdated"""
+    try:
+        with open(BUILD_CACHE_FILE) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != BUILD_CACHE_VERSION:
+        return {}
+    return cache.get("dates", {})
+
+def save_build_cache(dates):
+    """Persists the per-date fingerprint cache"""
+    write_output(BUILD_CACHE_FILE, json.dumps({"version": BUILD_CACHE_VERSION, "dates": dates}, separators=(",", ":")))
+
+def scan_folder(path):
+    """Lists a folder once, returning its DirEntry objects or None if it is not a folder"""
+    try:
+        with os.scandir(path) as it:
+            return list(it)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+def content_hash(path):
+    """Returns a short SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+def content_key(value):
+    """Returns a short digest of a JSON-serializable value, used to detect changed stage inputs"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()[:HASH_LENGTH]
+
+def read_proc_io():
+    """Returns this process's I/O counters from /proc (Linux only; empty elsewhere)
+    The counters are read with a single read() whose size is returned as "probe", so callers can discount it"""
+    try:
+        fd = os.open("/proc/self/io", os.O_RDONLY)
+        try:
+            data = os.read(fd, 4096)
+        finally:
+            os.close(fd)
+    except OSError:
+        return {}
+    counters = {key: int(value) for key, value in (line.split(": ") for line in data.decode().splitlines())}
+    counters["probe"] = len(data)
+    return counters
+
+class BuildProfiler:
+    """Records the duration and file-system activity of each build phase once started (--profile)
+    Work done in worker processes (--images, --precompress) only shows up as the phase's duration"""
+    AUDIT_EVENTS = {"open": "files_opened", "os.scandir": "dirs_visited", "os.listdir": "dirs_visited"}
+    PROC_IO = {"rchar": "bytes_read", "wchar": "bytes_written", "syscr": "read_syscalls", "syscw": "write_syscalls"}
+
+    def __init__(self):
+        self.enabled = False
+        self.hooked = False
+        self.counts = collections.Counter()
+        self.phases = []
+        self.started = None
+
+    def start(self):
+        self.enabled = True
+        self.phases = []
+        self.started = time.perf_counter()
+        if not self.hooked:
+            sys.addaudithook(self.audit)  # Audit hooks cannot be removed, so one is installed for good
+            self.hooked = True
+
+    def audit(self, event, args):
+        if self.enabled and event in self.AUDIT_EVENTS:
+            self.counts[self.AUDIT_EVENTS[event]] += 1
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        io_before = read_proc_io()
+        counts_before = self.counts.copy()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            counts = self.counts - counts_before
+            io_after = read_proc_io()
+            metrics = {"phase": name, "seconds": round(seconds, 4)}
+            metrics.update({label: counts[label] for label in dict.fromkeys(self.AUDIT_EVENTS.values())})
+            if io_after:
+                # Discount the read of io_before, which io_after already counts
+                io_after["rchar"] -= io_before["probe"]
+                io_after["syscr"] -= 1
+                metrics.update({label: io_after[key] - io_before[key] for key, label in self.PROC_IO.items()})
+            self.phases.append(metrics)
+
+    def report(self, path=BUILD_METRICS_FILE):
+        """Prints the phases and writes them, with the run's output counts, to the metrics file"""
+        total = time.perf_counter() - self.started
+        for metrics in self.phases:
+            print(f"  {metrics['phase']:<28} {metrics['seconds']:>8.3f}s  {metrics['dirs_visited']:>6} dirs  "
+                  f"{metrics['files_opened']:>6} files  {metrics.get('bytes_read', 0):>12,} B read  "
+                  f"{metrics.get('bytes_written', 0):>12,} B written")
+        write_output(path, json.dumps({
+            "finished": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "total_seconds": round(total, 4),
+            "phases": self.phases,
+            "outputs": dict(OUTPUT_STATS)
+        }, indent=2))
+        print(f"Generated {path} ({total:.2f}s total)")
+
+PROFILER = BuildProfiler()
+
+def stage_name(stage):
+    """Names a manifest stage for the profiler (stages may be functools.partial objects)"""
+    return getattr(stage, "func", stage).__name__
+
+def write_output(path, content):
+    """Writes content (str or bytes) through a temp file and an atomic rename, unless the file already holds it
+    Returns True if the file was written"""
+    data = content.encode() if isinstance(content, str) else content
+    try:
+        with open(path, "rb") as f:
+            unchanged = hashlib.sha256(f.read()).digest() == hashlib.sha256(data).digest()
+    except FileNotFoundError:
+        unchanged = False
+    if unchanged:
+        OUTPUT_STATS["skipped"] += 1
+        return False
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+    OUTPUT_STATS["written"] += 1
+    OUTPUT_STATS["bytes"] += len(data)
+    return True
+
+def remove_output(path):
+    """Deletes a generated file along with the .gz/.br sidecars --precompress wrote for it"""
+    for target in (path, path + ".gz", path + ".br"):
+        if os.path.exists(target):
+            os.remove(target)
+
+def sidecar_source(name):
+    """Maps a precompressed sidecar name to the file it belongs to (other names are returned unchanged)"""
+    return name[:-3] if name.endswith((".gz", ".br")) else name
+
+def versioned_url(url, path):
+    """Appends the content hash of path to url as a ?v= query"""
+    return f"{url}?v={content_hash(path)}"
+
+def asset_path(url):
+    """Strips the ?v= version from a manifest URL, leaving the file path"""
+    return url.split("?", 1)[0]
+
+def png_names(listing):
+    """Returns the sorted names of the PNG files in a folder listing (same matches as glob *.png)"""
+    return sorted(e.name for e in listing if e.name.endswith(".png") and not e.name.startswith("."))
+
+def scan_date_folder(strategy, date_entry, cached):
+    """Scans one date folder in a single pass, reusing the cached entry if the folder is unchanged
+    Returns (fingerprint, entry, rescanned); entry is None if the folder holds no data"""
+    date_folder = date_entry.name
+    listing = scan_folder(date_entry.path)
+    if listing is None:
+        return None, None, False
+    
+    # Fingerprint: the plot names of each data subfolder, read from the listings, plus output.json's mtime and size.
+    # Files the build writes into the folder (fragments, variants, sidecars) are left out, so writing them does not
+    # trigger a rescan, and only output.json is stat'ed. A plot rewritten in place under the same name keeps the
+    # fingerprint: watch mode rescans it, a one-off build needs --full-rebuild.
+    subfolders = {e.name: e for e in listing if e.name in DATE_SUBFOLDERS and e.is_dir()}
+    sub_listings = {}
+    plot_names = []
+    for sub in DATE_SUBFOLDERS:
+        sub_listing = scan_folder(subfolders[sub].path) if sub in subfolders else None
+        if sub_listing is not None:
+            sub_listings[sub] = sub_listing
+        plot_names.append(png_names(sub_listing) if sub_listing is not None else None)
+    fingerprint = [content_key(plot_names)]
+    output_json = next((e for e in sub_listings.get("output", []) if e.name == "output.json"), None)
+    if output_json is not None:
+        st = output_json.stat()
+        fingerprint.append([st.st_mtime_ns, st.st_size])
+    
+    if cached and cached.get("fingerprint") == fingerprint:
+        return fingerprint, cached.get("entry"), False
+    
+    # Check for data
+    output_listing = sub_listings.get("output", [])
+    has_output = any(e.name == "output.json" for e in output_listing)
+    forward_images = png_names(sub_listings.get("forward", []))
+    backward_images = png_names(sub_listings.get("backward", []))
+    output_images = png_names(output_listing)
+    
+    if not (has_output or forward_images or backward_images or output_images):
+        return fingerprint, None, True
+    
+    # Every URL carries the content hash of its file so it can be cached as immutable
+    def urls(sub, names):
+        return [versioned_url(f"{strategy}/{date_folder}/{sub}/{img}", os.path.join(date_entry.path, sub, img)) for img in names]
+    
+    output_file = f"{strategy}/{date_folder}/output/output.json"
+    return fingerprint, {
+        "date": date_folder,
+        "has_output": has_output,
+        "output_file": versioned_url(output_file, os.path.join(date_entry.path, "output", "output.json")) if has_output else None,
+        "forward_images": urls("forward", forward_images),
+        "backward_images": urls("backward", backward_images),
+        "output_images": urls("output", output_images)
+    }, True
+
+def write_manifest(manifest):
+    """Writes the root index and the per-strategy/per-month shards holding the date entries"""
+    index = {}
+    written = set()
+    for strategy, strategy_data in manifest.items():
+        months = collections.OrderedDict()
+        for item in strategy_data["dates"]:
+            public_item = {k: v for k, v in item.items() if not k.startswith("_")}
+            months.setdefault(item["date"][:7], []).append(public_item)
+        
+        index[strategy] = {
+            "name": strategy_data["name"],
+            "description": strategy_data["description"],
+            "months": []
+        }
+        for month, items in months.items():
+            shard_file = f"{MANIFEST_SHARD_DIR}/{strategy}/{month}.json"
+            os.makedirs(os.path.dirname(shard_file), exist_ok=True)
+            write_output(shard_file, json.dumps({"dates": items}, indent=2))
+            written.add(os.path.normpath(shard_file))
+            index[strategy]["months"].append({
+                "month": month,
+                "shard": versioned_url(shard_file, shard_file),
+                "dates": [item["date"] for item in items]
+            })
+
+    # Drop shards for months that no longer have any data
+    for dirpath, _, filenames in os.walk(MANIFEST_SHARD_DIR):
+        for name in map(sidecar_source, filenames):
+            path = os.path.normpath(os.path.join(dirpath, name))
+            if name.endswith(".json") and path not in written:
+                remove_output(path)
+
+    write_output(MANIFEST_FILE, json.dumps(index, indent=2))
+
+def image_variant_path(path, suffix):
+    """Returns the path of a derived image, e.g. plot.png -> plot.webp"""
+    return path[:-len(".png")] + suffix
+
+def is_up_to_date(target, source_mtime_ns):
+    """True if target exists and is at least as new as its source"""
+    try:
+        return os.stat(target).st_mtime_ns >= source_mtime_ns
+    except OSError:
+        return False
+
+def render_image_variants(source, targets):
+    """Writes the requested variants of one PNG plot (runs in a worker process)"""
+    with Image.open(source) as img:
+        img.load()
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+        for suffix, target in targets:
+            tmp = target + ".tmp"
+            if suffix == THUMB_SUFFIX:
+                thumb = img.copy()
+                thumb.thumbnail((THUMB_WIDTH, THUMB_WIDTH * 4))
+                thumb.save(tmp, "WEBP", quality=WEBP_QUALITY, method=6)
+            elif suffix == ".webp":
+                img.save(tmp, "WEBP", quality=WEBP_QUALITY, method=6)
+            elif suffix == ".avif":
+                img.save(tmp, "AVIF", quality=AVIF_QUALITY)
+            os.replace(tmp, target)
+    return len(targets)
+
+def optimize_images(manifest, avif=False, workers=None):
+    """Creates WebP (and optionally AVIF) versions plus grid thumbnails for every plot"""
+    if Image is None:
+        print("Skipping image optimization: Pillow is not installed (pip install Pillow)")
+        return
+    suffixes = [THUMB_SUFFIX, ".webp"]
+    if avif:
+        Image.init()
+        if ".avif" in Image.registered_extensions():
+            suffixes.append(".avif")
+        else:
+            print("AVIF output is not supported by this Pillow build; writing WebP only")
+
+    # Dates already carrying these variants were handled by an earlier build
+    entries = [item for strategy_data in manifest.values() for item in strategy_data["dates"]
+               if item.get("image_variants") != suffixes]
+    jobs = {}
+    for item in entries:
+        for url in item["forward_images"] + item["backward_images"] + item["output_images"]:
+            if is_packed(url):
+                continue
+            source = os.path.join(ROOT_DIR, asset_path(url))
+            source_mtime = os.stat(source).st_mtime_ns
+            targets = [(suffix, image_variant_path(source, suffix)) for suffix in suffixes
+                       if not is_up_to_date(image_variant_path(source, suffix), source_mtime)]
+            if targets:
+                jobs[source] = (item, targets)
+
+    failed = []
+    written = 0
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {source: pool.submit(render_image_variants, source, targets) for source, (_, targets) in jobs.items()}
+            for source, future in futures.items():
+                try:
+                    written += future.result()
+                except Exception as e:
+                    print(f"Failed to optimize {source}: {e}")
+                    failed.append(jobs[source][0])
+
+    # A date only advertises variants once every one of its plots has them
+    for item in entries:
+        if not any(item is failed_item for failed_item in failed):
+            item["image_variants"] = suffixes
+    print(f"Optimized images ({written} variants written for {len(jobs)} plots)")
+
+def render_sprite_sheet(sources, target, columns):
+    """Tiles plots row by row into one contact sheet (runs in a worker process)"""
+    tile_width, tile_height = SPRITE_TILE
+    rows = -(-len(sources) // columns)
+    sheet = Image.new("RGB", (columns * tile_width, rows * tile_height), "white")
+    for i, source in enumerate(sources):
+        with Image.open(source) as img:
+            img.load()
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA")
+            img.thumbnail(SPRITE_TILE)
+            x = i % columns * tile_width + (tile_width - img.width) // 2
+            y = i // columns * tile_height + (tile_height - img.height) // 2
+            sheet.paste(img, (x, y), img if img.mode == "RGBA" else None)
+    tmp = target + ".tmp"
+    sheet.save(tmp, "WEBP", quality=WEBP_QUALITY, method=6)
+    os.replace(tmp, target)
+
+def load_sprite_index(path):
+    """Loads the key and sprites map recorded next to a date's sheets, or None"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def build_sprites(manifest, workers=None):
+    """Tiles each date's gallery plots into contact sheets and maps every plot to its cell
+    Sheets are only redrawn when a date's plots change; sheets no longer referenced are removed."""
+    if Image is None:
+        print("Skipping contact sheets: Pillow is not installed (pip install Pillow)")
+        drop_sprites(manifest)
+        return
+    settings = [SPRITE_TILE, SPRITE_COLUMNS, SPRITE_SHEET_TILES, WEBP_QUALITY]
+    referenced = set()
+    pending = []
+    for strategy, strategy_data in manifest.items():
+        for item in strategy_data["dates"]:
+            lists = {name: item[name] for name in SPRITE_LISTS
+                     if len(item[name]) >= SPRITE_MIN_PLOTS and not any(is_packed(url) for url in item[name])}
+            if not lists:
+                item.pop("sprites", None)
+                item.pop("_sprites_key", None)
+                continue
+            sprite_key = content_key([lists, settings])
+            index_path = os.path.join(ROOT_DIR, SPRITE_DIR, strategy, item["date"], SPRITE_INDEX_FILE)
+            if item.get("_sprites_key") != sprite_key:
+                # A rescan rebuilds the entry without its sheets; the date's index still has them
+                index = load_sprite_index(index_path)
+                if index and index.get("key") == sprite_key:
+                    item["sprites"] = index["sprites"]
+                    item["_sprites_key"] = sprite_key
+            sheets = item.get("sprites", {}).get("sheets", [])
+            paths = [os.path.join(ROOT_DIR, asset_path(sheet["url"])) for sheet in sheets] + [index_path]
+            if item.get("_sprites_key") == sprite_key and all(os.path.exists(path) for path in paths):
+                referenced.update(os.path.normpath(path) for path in paths)
+                continue
+            pending.append((strategy, item, sprite_key, lists))
+
+    failed = 0
+    drawn = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Submit every sheet first so the workers are not held up by one date at a time
+            drawings = []
+            for strategy, item, sprite_key, lists in pending:
+                sprites = {"tile": list(SPRITE_TILE), "sheets": []}
+                jobs = []
+                for name, urls in lists.items():
+                    sprites[name] = []
+                    for start in range(0, len(urls), SPRITE_SHEET_TILES):
+                        chunk = urls[start:start + SPRITE_SHEET_TILES]
+                        columns = min(SPRITE_COLUMNS, len(chunk))
+                        path = f"{SPRITE_DIR}/{strategy}/{item['date']}/{name[:-len('_images')]}-{start // SPRITE_SHEET_TILES}.webp"
+                        target = os.path.join(ROOT_DIR, path)
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        sources = [os.path.join(ROOT_DIR, asset_path(url)) for url in chunk]
+                        jobs.append((path, target, pool.submit(render_sprite_sheet, sources, target, columns)))
+                        sheet = len(sprites["sheets"])
+                        sprites["sheets"].append({"url": path, "columns": columns, "rows": -(-len(chunk) // columns)})
+                        sprites[name] += [[sheet, i % columns, i // columns] for i in range(len(chunk))]
+                drawings.append((strategy, item, sprite_key, sprites, jobs))
+
+            for strategy, item, sprite_key, sprites, jobs in drawings:
+                try:
+                    for path, target, future in jobs:
+                        future.result()
+                        referenced.add(os.path.normpath(target))
+                except Exception as e:
+                    print(f"Failed to draw contact sheets for {strategy}/{item['date']}: {e}")
+                    item.pop("sprites", None)
+                    item.pop("_sprites_key", None)
+                    failed += 1
+                    continue
+                for sheet, (path, target, _) in zip(sprites["sheets"], jobs):
+                    sheet["url"] = versioned_url(path, target)
+                index_path = os.path.join(ROOT_DIR, SPRITE_DIR, strategy, item["date"], SPRITE_INDEX_FILE)
+                write_output(index_path, json.dumps({"key": sprite_key, "sprites": sprites}, separators=(",", ":")))
+                referenced.add(os.path.normpath(index_path))
+                item["sprites"] = sprites
+                item["_sprites_key"] = sprite_key
+                drawn += len(jobs)
+
+    # Sheets of dates that were removed, shortened or archived since an earlier build
+    removed = 0
+    for dirpath, _, filenames in os.walk(os.path.join(ROOT_DIR, SPRITE_DIR), topdown=False):
+        for name in filenames:
+            path = os.path.normpath(os.path.join(dirpath, name))
+            if path not in referenced:
+                os.remove(path)
+                removed += 1
+        if not os.listdir(dirpath):
+            os.rmdir(dirpath)
+    print(f"Generated contact sheets ({drawn} sheets drawn for {len(pending) - failed} dates, {removed} removed)")
+
+def drop_sprites(manifest):
+    """Stops entries from pointing at contact sheets drawn by an earlier --sprites build"""
+    for strategy_data in manifest.values():
+        for item in strategy_data["dates"]:
+            item.pop("sprites", None)
+            item.pop("_sprites_key", None)
+
+def blob_url(url):
+    """Maps a versioned plot URL to its place in the blob store"""
+    path, _, version = url.partition("?v=")
+    return f"{BLOB_DIR}/{version}/{os.path.basename(path)}"
+
+def link_to_blob(source, blob):
+    """Atomically replaces a per-date copy with a relative symlink to its blob
+    The blob is made read-only, so writing through the link fails instead of changing every date sharing it"""
+    os.chmod(blob, 0o444)
+    os.symlink(os.path.relpath(blob, os.path.dirname(source)), source + ".tmp")
+    os.replace(source + ".tmp", source)
+
+def dedupe_images(manifest, link=False):
+    """Stores every plot once in the blob store and points date entries at the blobs
+    With link, per-date copies are replaced by symlinks to their blob"""
+    referenced = set()
+    stored = 0
+    linked = 0
+    for strategy_data in manifest.values():
+        for item in strategy_data["dates"]:
+            # Per-date URLs are kept so a later build without --dedupe can restore them
+            local = item.setdefault("_local_images", {name: item[name] for name in IMAGE_LISTS})
+            for name in IMAGE_LISTS:
+                blobs = []
+                for url in local[name]:
+                    source = os.path.join(ROOT_DIR, asset_path(url))
+                    blob_path = blob_url(url)
+                    blob = os.path.join(ROOT_DIR, blob_path)
+                    if not os.path.exists(blob):
+                        os.makedirs(os.path.dirname(blob), exist_ok=True)
+                        with open(source, "rb") as f:
+                            write_output(blob, f.read())
+                        stored += 1
+                    if link and not os.path.islink(source):
+                        link_to_blob(source, blob)
+                        linked += 1
+                    referenced.add(os.path.normpath(os.path.dirname(blob)))
+                    # The blob is a copy stored under the plot's content hash, so the URL's version carries over
+                    blobs.append(f"{blob_path}?v={url.partition('?v=')[2]}")
+                if item[name] != blobs:
+                    item[name] = blobs
+                    item.pop("image_variants", None)  # Variants are looked up next to the blobs
+
+    # Blobs no longer referenced by any date go, along with their image variants
+    removed = 0
+    blob_root = os.path.join(ROOT_DIR, BLOB_DIR)
+    if os.path.isdir(blob_root):
+        for entry in os.scandir(blob_root):
+            if entry.is_dir() and os.path.normpath(entry.path) not in referenced:
+                for name in os.listdir(entry.path):
+                    os.remove(os.path.join(entry.path, name))
+                os.rmdir(entry.path)
+                removed += 1
+    print(f"Deduplicated plots into {BLOB_DIR}/ ({len(referenced)} unique, {stored} stored, "
+          f"{linked} per-date copies linked, {removed} unused removed)")
+
+def restore_date_images(manifest):
+    """Points entries deduplicated by an earlier --dedupe build back at their per-date copies"""
+    for strategy_data in manifest.values():
+        for item in strategy_data["dates"]:
+            local = item.pop("_local_images", None)
+            if local:
+                item.update(local)
+                item.pop("image_variants", None)
+
+def is_packed(url):
+    """True for a manifest URL that addresses a byte range of an archival pack"""
+    return "#" in url and asset_path(url).endswith(".pack")
+
+def pack_members(index, pack_path):
+    """Maps each date and image list of a pack index to {file name: content hash}
+    Members of indexes written before hashes were recorded are hashed from the pack itself"""
+    pack = None
+    members = {}
+    for date_key, lists in index["dates"].items():
+        members[date_key] = {}
+        for name, entries in lists.items():
+            members[date_key][name] = {}
+            for entry in entries:
+                if len(entry) < 4 and pack is None:
+                    with open(pack_path, "rb") as f:
+                        pack = f.read()
+                start, length = entry[1], entry[2]
+                digest = entry[3] if len(entry) > 3 else hashlib.sha256(pack[start:start + length]).hexdigest()[:HASH_LENGTH]
+                members[date_key][name][entry[0]] = digest
+    return members
+
+def write_pack(pack_path, index_path, dates, old_index, old_pack):
+    """Writes a month's pack and index from the plots of the given dates
+    Members come from the previous pack (old_index/old_pack) or, for loose plots, from disk.
+    Every date of the previous index is carried over, whether or not it has new plots."""
+    chunks = []
+    offset = 0
+    index = {}
+    for date_key in sorted(set(dates) | set(old_index)):
+        index[date_key] = {}
+        for name in IMAGE_LISTS:
+            members = {entry[0]: old_pack[entry[1]:entry[1] + entry[2]]
+                       for entry in old_index.get(date_key, {}).get(name, [])}
+            for url in dates.get(date_key, {}).get(name, []):
+                with open(os.path.join(ROOT_DIR, asset_path(url)), "rb") as f:
+                    members[os.path.basename(asset_path(url))] = f.read()
+            index[date_key][name] = []
+            for file_name in sorted(members):
+                data = members[file_name]
+                digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+                index[date_key][name].append([file_name, offset, len(data), digest])
+                chunks.append(data)
+                offset += len(data)
+    pack = b"".join(chunks)
+    version = hashlib.sha256(pack).hexdigest()[:HASH_LENGTH]
+    os.makedirs(os.path.dirname(pack_path), exist_ok=True)
+    write_output(pack_path, pack)
+    write_output(index_path, json.dumps({"version": version, "dates": index}, separators=(",", ":")))
+    return {"version": version, "dates": index}
+
+def archive_images(manifest, days=None):
+    """Packs the plots of dates older than days into per-strategy/month packs and points the manifest at them
+    Without days, only dates packed by earlier builds are pointed at their packs. Dates a pack holds are listed
+    even when their folders no longer have any plots (see prune_archived_plots())."""
+    pack_root = os.path.join(ROOT_DIR, PACK_DIR)
+    if days is None and not os.path.isdir(pack_root):
+        return
+    cutoff = (datetime.date.today() - datetime.timedelta(days=days)).isoformat() if days is not None else ""
+    rewritten = 0
+    restored = 0
+    for strategy, strategy_data in manifest.items():
+        months = collections.defaultdict(list)
+        for item in strategy_data["dates"]:
+            months[item["date"][:7]].append(item)
+        # Months packed by earlier builds, including those whose date folders are now empty
+        strategy_packs = os.path.join(pack_root, strategy)
+        if os.path.isdir(strategy_packs):
+            for name in os.listdir(strategy_packs):
+                if name.endswith(".json"):
+                    months.setdefault(name[:-len(".json")], [])
+        for month, items in months.items():
+            pack = f"{PACK_DIR}/{strategy}/{month}.pack"
+            pack_path = os.path.join(ROOT_DIR, pack)
+            index_path = os.path.join(pack_root, strategy, f"{month}.json")
+            index = {"version": None, "dates": {}}
+            if os.path.exists(index_path):
+                with open(index_path) as f:
+                    index = json.load(f)
+
+            # The scan drops dates whose folders hold no data; their entries are rebuilt from the index
+            listed = {item["date"] for item in items}
+            for date_key in sorted(index["dates"]):
+                if date_key not in listed:
+                    item = {"date": date_key, "has_output": False, "output_file": None}
+                    item.update({name: [] for name in IMAGE_LISTS})
+                    items.append(item)
+                    strategy_data["dates"].append(item)
+                    restored += 1
+
+            # Loose plots of archived dates that the pack does not hold yet, or holds an older version of
+            members = pack_members(index, pack_path)
+            loose = {}
+            for item in items:
+                if item["date"] < cutoff or item["date"] in index["dates"]:
+                    packed = members.get(item["date"], {})
+                    loose[item["date"]] = {name: [url for url in item[name] if not is_packed(url) and
+                                                  packed.get(name, {}).get(os.path.basename(asset_path(url))) != url.partition("?v=")[2]]
+                                           for name in IMAGE_LISTS}
+            if not loose:
+                continue
+            if any(urls for lists in loose.values() for urls in lists.values()):
+                old_pack = b""
+                if index["dates"] and os.path.exists(pack_path):
+                    with open(pack_path, "rb") as f:
+                        old_pack = f.read()
+                index = write_pack(pack_path, index_path, loose, index["dates"], old_pack)
+                rewritten += 1
+
+            pack_url = f"{pack}?v={index['version']}"
+            for item in items:
+                lists = index["dates"].get(item["date"])
+                if lists is None:
+                    continue
+                for name in IMAGE_LISTS:
+                    item[name] = [f"{pack_url}#{entry[1]}-{entry[1] + entry[2] - 1}/{entry[0]}" for entry in lists[name]]
+                item.pop("image_variants", None)  # Variants are not packed
+        if restored:
+            strategy_data["dates"].sort(key=lambda x: x["date"], reverse=True)
+    if days is not None or rewritten or restored:
+        label = f"dates before {cutoff}" if days is not None else "previously archived dates"
+        print(f"Archived plots of {label} ({rewritten} packs written, {restored} dates listed from their packs)")
+
+def prune_archived_plots(manifest):
+    """Deletes the loose copies (and image variants) of plots their month's pack already holds
+    A copy is only removed when its content matches the packed one."""
+    removed = 0
+    for strategy in manifest:
+        strategy_packs = os.path.join(ROOT_DIR, PACK_DIR, strategy)
+        if not os.path.isdir(strategy_packs):
+            continue
+        for name in sorted(os.listdir(strategy_packs)):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(strategy_packs, name)) as f:
+                index = json.load(f)
+            members = pack_members(index, os.path.join(strategy_packs, name[:-len(".json")] + ".pack"))
+            for date_key, lists in members.items():
+                for list_name, files in lists.items():
+                    folder = os.path.join(ROOT_DIR, strategy, date_key, list_name[:-len("_images")])
+                    for file_name, digest in files.items():
+                        source = os.path.join(folder, file_name)
+                        if not os.path.isfile(source) or content_hash(source) != digest:
+                            continue
+                        for path in [source] + [image_variant_path(source, suffix) for suffix in (THUMB_SUFFIX, ".webp", ".avif")]:
+                            if os.path.lexists(path):
+                                os.remove(path)
+                                removed += 1
+    print(f"Pruned archived plots ({removed} loose files removed)")
+
+def normalize_output(source, target):
+    """Rewrites one output.json as strict, minified JSON with non-finite numbers as null
+    Raises ValueError if the file is not valid JSON or not a list/object"""
+    with open(source) as f:
+        data = json.load(f, parse_constant=lambda _: None)
+    if not isinstance(data, (list, dict)):
+        raise ValueError(f"expected a list or object at the top level, got {type(data).__name__}")
+    write_output(target, json.dumps(data, separators=(",", ":"), allow_nan=False))
+
+def normalize_outputs(manifest):
+    """Points every date at a normalized output.min.json, rejecting malformed output.json files"""
+    normalized = 0
+    rejected = 0
+    for strategy_data in manifest.values():
+        for item in strategy_data["dates"]:
+            # Entries carrying _source_file were normalized (or rejected) by an earlier build
+            source_url = item.get("output_file")
+            if not source_url or "_source_file" in item:
+                continue
+            source = os.path.join(ROOT_DIR, asset_path(source_url))
+            target_url = os.path.join(os.path.dirname(asset_path(source_url)), NORMALIZED_OUTPUT)
+            target = os.path.join(ROOT_DIR, target_url)
+            try:
+                if not is_up_to_date(target, os.stat(source).st_mtime_ns):
+                    normalize_output(source, target)
+                    normalized += 1
+            except ValueError as e:
+                # Keep a malformed file off the site rather than serving a report that cannot load
+                print(f"Rejected {asset_path(source_url)}: {e}")
+                item.update({"has_output": False, "output_file": None, "_source_file": source_url})
+                item.pop("summary_file", None)
+                rejected += 1
+                continue
+            item["_source_file"] = source_url
+            item["output_file"] = versioned_url(target_url, target)
+    print(f"Normalized output.json files ({normalized} written, {rejected} rejected)")
+
+def output_rows(strategy, data):
+    """Returns the per-ticker rows of a parsed output.json for any strategy layout"""
+    if strategy == "m":
+        return (data.get("scan_results") or []) if isinstance(data, dict) else []
+    return data if isinstance(data, list) else [data]
+
+def row_ticker(row):
+    """Returns a row's ticker symbol (dma/m use Ticker, pv uses ticker)"""
+    return row.get("Ticker", row.get("ticker"))
+
+def row_value(row, path):
+    """Follows a key path into nested output.json objects, returning None if any step is missing"""
+    for key in path:
+        if not isinstance(row, dict):
+            return None
+        row = row.get(key)
+    return row
+
+class OutputRecord:
+    """One ticker's row of an output.json, reduced to the typed fields of its strategy's schema"""
+    __slots__ = ("ticker",)
+    fields = []
+    attrs = ()
+
+    def __init__(self, ticker, values):
+        self.ticker = ticker
+        for attr, value in zip(self.attrs, values):
+            setattr(self, attr, value)
+
+    def values(self):
+        """Returns the field values in schema order"""
+        return [getattr(self, attr) for attr in self.attrs]
+
+    def get(self, column):
+        """Returns a field by its output.json column name"""
+        return getattr(self, self.columns[column])
+
+def record_type(name, fields):
+    """Creates the OutputRecord subclass for a schema; column names become snake_case attributes"""
+    attrs = tuple(re.sub(r"\W+", "_", field).strip("_").lower() for field, _, _ in fields)
+    columns = {field: attr for (field, _, _), attr in zip(fields, attrs)}
+    return type(name, (OutputRecord,), {"__slots__": attrs, "fields": fields, "attrs": attrs, "columns": columns})
+
+DmaRecord = record_type("DmaRecord", DMA_HISTORY_FIELDS)
+PvRecord = record_type("PvRecord", HISTORY_FIELDS["pv"])
+MRecord = record_type("MRecord", HISTORY_FIELDS["m"])
+RECORD_TYPES = {"dma": DmaRecord, "dma_bo": DmaRecord, "dma_hmm": DmaRecord, "dma_hmm_bo": DmaRecord,
+                "pv": PvRecord, "m": MRecord}
+
+# Parsed outputs of the current build, {strategy: {date: [records]}}, filled by ingest_outputs()
+INGESTED = {}
+
+def parse_output(strategy, path):
+    """Reads one output.json and validates its rows against the strategy's schema
+    Returns (rows, errors); each row is [ticker, *values in schema order]. Invalid values become None."""
+    with open(path) as f:
+        data = json.load(f)
+    errors = []
+    if strategy == "m" and not isinstance(data, dict):
+        return [], [f"expected an object with scan_results, got {type(data).__name__}"]
+    rows = []
+    for i, row in enumerate(output_rows(strategy, data)):
+        if not isinstance(row, dict):
+            errors.append(f"row {i}: expected an object, got {type(row).__name__}")
+            continue
+        ticker = row_ticker(row)
+        if not isinstance(ticker, str) or not ticker:
+            errors.append(f"row {i}: missing ticker")
+            continue
+        values = [ticker]
+        for name, path_, kind in HISTORY_FIELDS[strategy]:
+            value = row_value(row, path_)
+            if value is None:
+                values.append(None)
+            elif kind == "f64" and isinstance(value, (int, float)) and not isinstance(value, bool):
+                values.append(float(value))
+            elif kind == "str" and not isinstance(value, (dict, list)):
+                values.append(str(value))
+            else:
+                expected = "a number" if kind == "f64" else "a scalar"
+                errors.append(f"{ticker}: {name} should be {expected}, got {json.dumps(value)[:40]}")
+                values.append(None)
+        rows.append(values)
+    return rows, errors
+
+def parse_output_job(job):
+    """Process pool entry point for parse_output(); job is (strategy, path)"""
+    return parse_output(*job)
+
+def load_ingest_cache():
+    """Loads the parsed-output cache, or an empty one if missing, outdated or made for other schemas"""
+    try:
+        with open(INGEST_CACHE_FILE) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != INGEST_CACHE_VERSION or cache.get("schemas") != content_key(HISTORY_FIELDS):
+        return {}
+    return cache.get("outputs", {})
+
+def ingest_outputs(manifest, workers=None):
+    """Parses every date's output into typed records (INGESTED), in parallel and reusing cached parses"""
+    cache = load_ingest_cache()
+    fresh_cache = {}
+    jobs = {}
+    INGESTED.clear()
+    for strategy, strategy_data in manifest.items():
+        if strategy not in RECORD_TYPES:
+            continue
+        for item in strategy_data["dates"]:
+            if not item.get("output_file"):
+                continue
+            key = f"{strategy}:{item['output_file'].partition('?v=')[2]}"
+            if key in cache:
+                fresh_cache[key] = cache[key]
+            else:
+                jobs[key] = (strategy, os.path.join(ROOT_DIR, asset_path(item["output_file"])))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for key, (rows, errors) in zip(jobs, pool.map(parse_output_job, jobs.values(), chunksize=8)):
+                fresh_cache[key] = {"rows": rows, "errors": errors}
+
+    error_count = 0
+    for strategy, strategy_data in manifest.items():
+        if strategy not in RECORD_TYPES:
+            continue
+        record = RECORD_TYPES[strategy]
+        dates = INGESTED[strategy] = {}
+        for item in strategy_data["dates"]:
+            if not item.get("output_file"):
+                continue
+            parsed = fresh_cache[f"{strategy}:{item['output_file'].partition('?v=')[2]}"]
+            dates[item["date"]] = [record(row[0], row[1:]) for row in parsed["rows"]]
+            if parsed["errors"]:
+                error_count += len(parsed["errors"])
+                print(f"Schema errors in {asset_path(item['output_file'])} ({len(parsed['errors'])}):")
+                for error in parsed["errors"][:INGEST_MAX_ERRORS]:
+                    print(f"  {error}")
+
+    write_output(INGEST_CACHE_FILE, json.dumps({"version": INGEST_CACHE_VERSION, "schemas": content_key(HISTORY_FIELDS),
+                                                "outputs": fresh_cache}, separators=(",", ":")))
+    print(f"Ingested output files ({len(fresh_cache)} distinct, {len(jobs)} parsed, {error_count} schema errors)")
+
+def ingested_records(strategy, item):
+    """Returns a date's records from INGESTED, parsing the file directly if the ingest stage did not run"""
+    records = INGESTED.get(strategy, {}).get(item["date"])
+    if records is None:
+        rows, _ = parse_output(strategy, os.path.join(ROOT_DIR, asset_path(item["output_file"])))
+        records = [RECORD_TYPES[strategy](row[0], row[1:]) for row in rows]
+    return records
+
+class ColumnStore:
+    """Every date's rows for one strategy, held as one typed array per column
+
+    Rows are kept sorted by (ticker, date), so a ticker's history is a contiguous slice of
+    each column. String columns (including ticker and date) are dictionary-encoded.
+    """
+
+    def __init__(self, fields):
+        self.fields = [("ticker", "str"), ("date", "str")] + [(name, kind) for name, _, kind in fields]
+        self.columns = {name: array(HISTORY_TYPECODES[kind]) for name, kind in self.fields}
+        self.strings = {name: [] for name, kind in self.fields if kind == "str"}
+        self.sources = {}
+        self.tickers = {}
+        self._codes = {name: {} for name in self.strings}
+
+    def __len__(self):
+        return len(self.columns["ticker"])
+
+    def _encode(self, name, value):
+        if value is None:
+            return HISTORY_NULL_CODE
+        value = str(value)
+        codes = self._codes[name]
+        if value not in codes:
+            codes[value] = len(self.strings[name])
+            self.strings[name].append(value)
+        return codes[value]
+
+    def append(self, date, source, records):
+        """Adds one date's OutputRecords; call sort() before reading ticker slices"""
+        for record in records:
+            self.columns["ticker"].append(self._encode("ticker", record.ticker))
+            self.columns["date"].append(self._encode("date", date))
+            for (name, kind), value in zip(self.fields[2:], record.values()):
+                if kind == "str":
+                    self.columns[name].append(self._encode(name, value))
+                else:
+                    self.columns[name].append(math.nan if value is None else value)
+        self.sources[date] = source
+
+    def drop_dates(self, dates):
+        """Removes every row belonging to the given dates"""
+        codes = {self._codes["date"][d] for d in dates if d in self._codes["date"]}
+        keep = [i for i, code in enumerate(self.columns["date"]) if code not in codes]
+        self._take(keep)
+        for date in dates:
+            self.sources.pop(date, None)
+
+    def sort(self):
+        """Orders rows by (ticker, date) and rebuilds the ticker slice index"""
+        tickers, dates = self.strings["ticker"], self.strings["date"]
+        order = sorted(range(len(self)), key=lambda i: (tickers[self.columns["ticker"][i]], dates[self.columns["date"][i]]))
+        self._take(order)
+        self.tickers = {}
+        for i, code in enumerate(self.columns["ticker"]):
+            start = self.tickers.get(tickers[code], (i,))[0]
+            self.tickers[tickers[code]] = (start, i + 1)
+
+    def _take(self, indexes):
+        for name, kind in self.fields:
+            column = self.columns[name]
+            self.columns[name] = array(column.typecode, [column[i] for i in indexes])
+
+    def column(self, name):
+        """Returns a whole column as a typed array (string columns hold codes; see decode())"""
+        return self.columns[name]
+
+    def decode(self, name, codes):
+        """Maps dictionary codes of a string column back to their values"""
+        strings = self.strings[name]
+        return [None if code == HISTORY_NULL_CODE else strings[code] for code in codes]
+
+    def ticker_history(self, ticker):
+        """Returns zero-copy slices of every column covering one ticker's rows"""
+        start, stop = self.tickers.get(ticker, (0, 0))
+        return {name: memoryview(column)[start:stop] for name, column in self.columns.items()}
+
+    def save(self, path):
+        header = json.dumps({
+            "byteorder": sys.byteorder,
+            "rows": len(self),
+            "fields": [{"name": name, "type": kind} for name, kind in self.fields],
+            "strings": self.strings,
+            "sources": self.sources,
+            "tickers": self.tickers
+        }, separators=(",", ":")).encode()
+        body = b"".join(self.columns[name].tobytes() for name, _ in self.fields)
+        write_output(path, HISTORY_MAGIC + struct.pack("<I", len(header)) + header + body)
+
+    @classmethod
+    def load(cls, path, fields):
+        """Reads a store written by save(); returns None if it is missing or has a different schema"""
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+        except OSError:
+            return None
+        if not blob.startswith(HISTORY_MAGIC):
+            return None
+        offset = len(HISTORY_MAGIC)
+        (header_size,) = struct.unpack_from("<I", blob, offset)
+        offset += 4
+        header = json.loads(blob[offset:offset + header_size])
+        offset += header_size
+
+        store = cls(fields)
+        if header["fields"] != [{"name": name, "type": kind} for name, kind in store.fields]:
+            return None
+        for name, kind in store.fields:
+            column = array(HISTORY_TYPECODES[kind])
+            size = header["rows"] * column.itemsize
+            column.frombytes(blob[offset:offset + size])
+            if header["byteorder"] != sys.byteorder:
+                column.byteswap()
+            store.columns[name] = column
+            offset += size
+        store.strings = header["strings"]
+        store._codes = {name: {v: i for i, v in enumerate(values)} for name, values in store.strings.items()}
+        store.sources = header["sources"]
+        store.tickers = {ticker: tuple(bounds) for ticker, bounds in header["tickers"].items()}
+        return store
+
+def history_path(strategy):
+    """Returns the path of a strategy's columnar history store"""
+    return os.path.join(ROOT_DIR, HISTORY_DIR, f"{strategy}.col")
+
+def load_history(strategy):
+    """Loads a strategy's columnar history store, or None if it has not been built"""
+    return ColumnStore.load(history_path(strategy), HISTORY_FIELDS.get(strategy, []))
+
+def build_history(manifest):
+    """Appends new or changed dates to each strategy's columnar history store"""
+    os.makedirs(os.path.join(ROOT_DIR, HISTORY_DIR), exist_ok=True)
+    appended = 0
+    for strategy, strategy_data in manifest.items():
+        fields = HISTORY_FIELDS.get(strategy)
+        if fields is None:
+            continue
+        items = {item["date"]: item for item in strategy_data["dates"] if item.get("output_file")}
+        sources = {date: item["output_file"] for date, item in items.items()}
+        if not sources and not os.path.exists(history_path(strategy)):
+            continue
+        store = load_history(strategy) or ColumnStore(fields)
+
+        # Dates whose output changed (new content hash) are replaced; vanished dates are dropped
+        stale = [date for date, source in store.sources.items() if sources.get(date) != source]
+        fresh = sorted(date for date, source in sources.items() if store.sources.get(date) != source)
+        if not stale and not fresh and os.path.exists(history_path(strategy)):
+            continue
+        store.drop_dates(stale)
+        for date in fresh:
+            store.append(date, sources[date], ingested_records(strategy, items[date]))
+        store.sort()
+        store.save(history_path(strategy))
+        appended += len(fresh)
+    print(f"Updated columnar history ({appended} dates appended)")
+
+def date_changes(strategy, previous, current):
+    """Compares two dates' records: changed or new signals, dropped tickers and large level moves"""
+    signal, levels = CHANGE_FIELDS[strategy]
+    before = {record.ticker: record for record in previous}
+    after = {record.ticker: record for record in current}
+    signals = []
+    moves = []
+    for ticker, record in sorted(after.items()):
+        old = before.get(ticker)
+        if old is None or (signal and old.get(signal) != record.get(signal)):
+            signals.append({"ticker": ticker, "from": old.get(signal) if old and signal else None,
+                            "to": record.get(signal) if signal else None})
+        if old is None:
+            continue
+        for level in levels:
+            a, b = old.get(level), record.get(level)
+            if a is not None and b is not None and a != 0 and abs(b - a) / abs(a) >= CHANGE_THRESHOLD:
+                moves.append({"ticker": ticker, "field": level, "from": a, "to": b, "change": round((b - a) / abs(a) * 100, 2)})
+    dropped = [{"ticker": ticker, "signal": before[ticker].get(signal) if signal else None}
+               for ticker in sorted(before.keys() - after.keys())]
+    return {"signals": signals, "dropped": dropped, "moves": moves}
+
+def build_changes(manifest):
+    """Writes each date's changes against the previous date, recomputing only changed pairs, and the rolling feed"""
+    computed = 0
+    feed = []
+    for strategy, strategy_data in manifest.items():
+        if strategy not in CHANGE_FIELDS:
+            continue
+        dated = sorted((item for item in strategy_data["dates"] if item.get("output_file")), key=lambda item: item["date"])
+        if dated:
+            dated[0].pop("changes_file", None)
+            dated[0].pop("_changes_key", None)
+        for previous, item in zip(dated, dated[1:]):
+            fragment = os.path.join(os.path.dirname(asset_path(item["output_file"])), CHANGES_FILE)
+            target = os.path.join(ROOT_DIR, fragment)
+            change_key = content_key([previous["output_file"], item["output_file"], CHANGE_FIELDS[strategy], CHANGE_THRESHOLD])
+            if item.get("_changes_key") == change_key and os.path.exists(target):
+                if len(feed) < CHANGES_FEED_LENGTH or item["date"] > feed[-1][0]:
+                    with open(target) as f:
+                        changes = json.load(f)
+                else:
+                    changes = None
+            else:
+                changes = {"date": item["date"], "previous": previous["date"]}
+                changes.update(date_changes(strategy, ingested_records(strategy, previous), ingested_records(strategy, item)))
+                write_output(target, json.dumps(changes, separators=(",", ":")))
+                item["changes_file"] = versioned_url(fragment, target)
+                item["_changes_key"] = change_key
+                computed += 1
+            if changes is not None:
+                feed.append((item["date"], strategy, changes))
+                feed.sort(key=lambda entry: (entry[0], entry[1]), reverse=True)
+                del feed[CHANGES_FEED_LENGTH:]
+
+    write_output(os.path.join(ROOT_DIR, CHANGES_FEED_FILE), json.dumps(
+        {"dates": [dict(changes, strategy=strategy) for _, strategy, changes in feed]}, separators=(",", ":")))
+    print(f"Generated day-over-day changes ({computed} dates compared, {len(feed)} in {CHANGES_FEED_FILE})")
+
+def search_prefix(ticker):
+    """Returns the index shard a ticker belongs to (its first character, or _ if not a letter/digit)"""
+    prefix = ticker[:1].upper()
+    return prefix if re.fullmatch(r"[A-Z0-9]", prefix) else "_"
+
+def build_search_index(manifest):
+    """Writes the ticker inverted index, sharded by ticker prefix, from the columnar history"""
+    shards = collections.defaultdict(dict)
+    labels = {}
+    for strategy in manifest:
+        spec = SEARCH_POSTING_FIELDS.get(strategy)
+        store = load_history(strategy) if spec else None
+        if store is None:
+            continue
+        signal_column, metric_column, labels[strategy] = spec
+        tickers = store.decode("ticker", store.column("ticker"))
+        dates = store.decode("date", store.column("date"))
+        signals = store.decode(signal_column, store.column(signal_column)) if signal_column else [None] * len(store)
+        metrics = store.column(metric_column)
+        for ticker, date, signal, metric in zip(tickers, dates, signals, metrics):
+            if ticker is None:
+                continue
+            posting = [strategy, date, signal, None if math.isnan(metric) else round(metric, 2)]
+            shards[search_prefix(ticker)].setdefault(ticker, []).append(posting)
+
+    os.makedirs(os.path.join(ROOT_DIR, SEARCH_DIR), exist_ok=True)
+    written = set()
+    for prefix, tickers in shards.items():
+        for postings in tickers.values():
+            postings.sort(key=lambda p: (p[1], p[0]), reverse=True)  # Newest first
+        path = os.path.join(ROOT_DIR, SEARCH_DIR, f"{prefix}.json")
+        write_output(path, json.dumps({"metrics": labels, "tickers": dict(sorted(tickers.items()))}, separators=(",", ":")))
+        written.add(os.path.normpath(path))
+
+    # Drop shards for prefixes that no longer have any ticker
+    for name in map(sidecar_source, os.listdir(os.path.join(ROOT_DIR, SEARCH_DIR))):
+        path = os.path.normpath(os.path.join(ROOT_DIR, SEARCH_DIR, name))
+        if name.endswith(".json") and path not in written:
+            remove_output(path)
+    print(f"Generated ticker search index ({sum(len(t) for t in shards.values())} tickers in {len(shards)} shards)")
+
+def js_to_fixed(value, digits):
+    """Formats a number like JavaScript's Number.prototype.toFixed (ties round away from zero)"""
+    quantum = Decimal(1).scaleb(-digits)
+    return str(Decimal(value).quantize(quantum, rounding=ROUND_HALF_UP))
+
+def js_string(value):
+    """Converts a JSON value to text the way a JavaScript template literal would"""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, list):
+        return ",".join("" if v is None else js_string(v) for v in value)
+    if isinstance(value, dict):
+        return "[object Object]"
+    return str(value)
+
+def table_header(h, strategy_key):
+    """Returns the display name of a summary table column"""
+    if strategy_key == "pv" and h in PV_HEADER_MAP:
+        return PV_HEADER_MAP[h]
+    # Replace underscores with spaces. The shell's "capitalize each word" regex has never matched
+    # (its \b is emitted as a backspace), so words keep their original case here too.
+    return HEADER_OVERRIDES.get(h.lower(), h.replace("_", " "))
+
+def table_cell(h, val, strategy_key):
+    """Formats one summary table cell, mirroring the column formatters of the app shell's buildColumns()"""
+    key = h.lower()
+    if isinstance(val, dict):
+        # Nested indicator objects: show their status / crossover only
+        if key in ("rsi", "trend", "mtf_trend", "adx") and val.get("status"):
+            val = val["status"]
+        elif key == "macd" and val.get("crossover"):
+            val = val["crossover"]
+    if key == "divergence" and isinstance(val, dict):
+        val = "Bullish" if val.get("bullish") else "Bearish" if val.get("bearish") else "None"
+    if key == "stops" and isinstance(val, dict):
+        sl = js_to_fixed(val["stop_loss"], 2) if val.get("stop_loss") else "N/A"
+        tp = js_to_fixed(val["take_profit"], 2) if val.get("take_profit") else "N/A"
+        sl_pct = f"({js_to_fixed(val['stop_loss_pct'], 0)})" if val.get("stop_loss_pct") else ""
+        tp_pct = f"({js_to_fixed(val['take_profit_pct'], 0)})" if val.get("take_profit_pct") else ""
+        val = f"SL {sl_pct}: {sl} | TP {tp_pct}: {tp}"
+    # Handle Arrays (e.g. Reasons): Join with comma
+    if isinstance(val, list):
+        val = ", ".join("" if v is None else js_string(v) for v in val)
+
+    # Signal coloring (generic) and Action coloring for PV
+    if h == "Signal" and val:
+        val = f'<span class="signal-{js_string(val)}">{js_string(val)}</span>'
+    if strategy_key == "pv" and key == "action" and val:
+        signal_class = re.sub(r"[^a-zA-Z]", "", js_string(val).split(" ")[0])  # Extract BUY from BUY (VOL BLOCKED)
+        val = f'<span class="signal-{signal_class}">{js_string(val)}</span>'
+    if val is None:
+        return ""
+    if isinstance(val, dict):
+        return json.dumps(val, separators=(",", ":"))  # Fallback to avoid [object Object]
+    if isinstance(val, (int, float)) and not isinstance(val, bool):
+        return js_to_fixed(val, 2)
+    return js_string(val)
+
+def json_to_table(data, strategy_key):
+    """Renders rows of output.json as the summary table HTML (Python port of the app shell's tableHtml())"""
+    if not data:
+        return "<p>No data available.</p>"
+    excluded = TABLE_EXCLUDED_COLUMNS + (PV_EXCLUDED_COLUMNS if strategy_key == "pv" else [])
+    if strategy_key == "pv":
+        headers = PV_COLUMNS
+    else:
+        headers = [h for h in data[0] if h not in excluded]
+
+    # Work out each column's header and responsive class once
+    columns = []
+    for h in headers:
+        hide = strategy_key == "pv" and h.lower() not in PV_ALWAYS_VISIBLE
+        columns.append((h, table_header(h, strategy_key), ' class="w3-hide-small"' if hide else ""))
+
+    parts = ['<table class="analysis-table w3-table-all w3-hoverable">', '<thead><tr class="w3-light-grey">']
+    parts.extend(f"<th{cls}>{display}</th>" for _, display, cls in columns)
+    parts.append("</tr></thead><tbody>")
+    for row in data:
+        parts.append("<tr>")
+        parts.extend(f"<td{cls}>{table_cell(h, row.get(h), strategy_key)}</td>" for h, _, cls in columns)
+        parts.append("</tr>")
+    parts.append("</tbody></table>")
+    return "".join(parts)
+
+def picture_html(img, item, alt, use_thumb=False, style=None):
+    """Markup for one plot, matching pictureHtml() in the app shell"""
+    variants = item.get("image_variants") or []
+    thumb = next((v for v in variants if v.startswith(".thumb")), None)
+
+    def variant_url(suffix):
+        path, _, query = img.partition("?")
+        return image_variant_path(path, suffix) + (f"?{query}" if query else "")
+
+    sources = ""
+    if use_thumb and thumb:
+        sources = f'<source type="image/webp" srcset="{variant_url(thumb)}">'
+    else:
+        if ".avif" in variants:
+            sources += f'<source type="image/avif" srcset="{variant_url(".avif")}">'
+        if ".webp" in variants:
+            sources += f'<source type="image/webp" srcset="{variant_url(".webp")}">'
+    full = variant_url(".webp") if ".webp" in variants else img
+    style_attr = f' style="{style}"' if style else ""
+    # Archived plots are byte ranges the shell has to fetch itself, so they get its lazy-loading markup
+    src = 'data-src' if is_packed(img) else 'src'
+    loading = ' loading="lazy" decoding="async"' if is_packed(img) else ""
+    return f'<picture>{sources}<img {src}="{img}" alt="{alt}" data-full="{full}"{loading}{style_attr} onclick="window.open(this.dataset.full)"></picture>'
+
+def render_m_summary(data, item):
+    """Renders the Momentum (m) summary: summary plots, then one card per scanned ticker"""
+    parts = []
+    output_images = item.get("output_images") or []
+    scan_summary_img = next((img for img in output_images if "scan_results_summary.png" in img), None)
+    hist_summary_img = next((img for img in output_images if "historical_context_summary.png" in img), None)
+
+    if scan_summary_img or hist_summary_img:
+        parts.append('<div class="gallery-grid">')
+        if scan_summary_img:
+            parts.append(f'<div class="gallery-item">{picture_html(scan_summary_img, item, "Scan Results Summary")}</div>')
+        if hist_summary_img:
+            parts.append(f'<div class="gallery-item">{picture_html(hist_summary_img, item, "Historical Context Summary")}</div>')
+        parts.append("</div><hr>")
+
+    scan_results = data.get("scan_results") or []
+    hist_context = data.get("historical_context") or {}
+    if not scan_results:
+        parts.append("<p>No data found.</p>")
+        return "".join(parts)
+
+    parts.append("<h3>Ticker Data</h3>")
+    for row in scan_results:
+        ticker = row.get("Ticker")
+        merged = {**row, **(hist_context.get(ticker) or {})}
+        parts.append('<div class="w3-card w3-margin-bottom w3-padding">')
+        parts.append(f"<h4><b>{js_string(ticker)}</b></h4>")
+        parts.append('<div class="w3-row-padding">')
+        parts.append('<div class="w3-twothird" style="overflow-x:auto;">')
+        parts.append(json_to_table([merged], "m"))
+        parts.append("</div>")
+        parts.append('<div class="w3-third">')
+        livetest_img = next((img for img in output_images if f"{ticker}_livetest.png" in img), None)
+        if livetest_img:
+            parts.append(f'<div class="gallery-item">{picture_html(livetest_img, item, f"{ticker} Livetest", True, "max-width:100%")}</div>')
+        else:
+            parts.append(f"<p>No plot available for {js_string(ticker)}.</p>")
+        parts.append("</div></div></div>")
+    return "".join(parts)
+
+def render_summary_fragments(manifest):
+    """Pre-renders each date's summary table into an HTML fragment next to its output.json"""
+    rendered = 0
+    for strategy, strategy_data in manifest.items():
+        for item in strategy_data["dates"]:
+            if not item.get("output_file"):
+                continue
+            # Re-render only when the data, the plots it links or their variants changed
+            render_key = content_key([item["output_file"], item["output_images"], item.get("image_variants")])
+            fragment = os.path.join(os.path.dirname(asset_path(item["output_file"])), SUMMARY_FRAGMENT)
+            if item.get("_summary_key") == render_key and item.get("summary_file") and os.path.exists(fragment):
+                continue
+
+            with open(os.path.join(ROOT_DIR, asset_path(item["output_file"]))) as f:
+                # Non-finite numbers render as empty cells, as in the browser
+                data = json.load(f, parse_constant=lambda _: None)
+            if strategy == "m":
+                html = render_m_summary(data if isinstance(data, dict) else {}, item)
+            else:
+                html = json_to_table(data if isinstance(data, list) else [data], strategy)
+            write_output(os.path.join(ROOT_DIR, fragment), html)
+            item["summary_file"] = versioned_url(fragment, os.path.join(ROOT_DIR, fragment))
+            item["_summary_key"] = render_key
+            rendered += 1
+    print(f"Rendered summary fragments ({rendered} updated)")
+
+def compress_asset(path):
+    """Writes maximum-level .gz and .br sidecars for one file unless they are already current
+    Returns (path, raw size, gzip size, brotli size or None, rewritten)"""
+    source_mtime = os.stat(path).st_mtime_ns
+    sidecars = [(path + ".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        sidecars.append((path + ".br", lambda data: brotli.compress(data, quality=11)))
+
+    rewritten = False
+    data = None
+    for target, compress in sidecars:
+        if is_up_to_date(target, source_mtime):
+            continue
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        with open(target + ".tmp", "wb") as f:
+            f.write(compress(data))
+        os.replace(target + ".tmp", target)
+        rewritten = True
+
+    br_size = os.path.getsize(path + ".br") if brotli is not None else None
+    return path, os.path.getsize(path), os.path.getsize(path + ".gz"), br_size, rewritten
+
+def text_assets(manifest):
+    """Lists the text assets the site serves, grouped by asset class"""
+    assets = {
+        "app shell": ["index.html", SERVICE_WORKER_FILE] + [f"{page}.html" for page in LEGAL_PAGES],
+        "renderer modules": [],
+        "manifest": [MANIFEST_FILE],
+        "raw reports": [],
+        "normalized reports": [],
+        "summary fragments": [],
+        "changes": [CHANGES_FEED_FILE],
+        "search index": []
+    }
+    for dirpath, _, filenames in os.walk(MANIFEST_SHARD_DIR):
+        assets["manifest"] += [os.path.join(dirpath, name) for name in sorted(filenames) if name.endswith(".json")]
+    if os.path.isdir(RENDERER_DIR):
+        assets["renderer modules"] = [os.path.join(RENDERER_DIR, name) for name in sorted(os.listdir(RENDERER_DIR)) if name.endswith(".js")]
+    for dirpath, _, filenames in os.walk(SEARCH_DIR):
+        assets["search index"] += [os.path.join(dirpath, name) for name in sorted(filenames) if name.endswith(".json")]
+    for strategy_data in manifest.values():
+        for item in strategy_data["dates"]:
+            if item.get("_source_file"):
+                assets["raw reports"].append(asset_path(item["_source_file"]))
+            if item.get("output_file") and item.get("output_file") != item.get("_source_file"):
+                assets["normalized reports"].append(asset_path(item["output_file"]))
+            if item.get("summary_file"):
+                assets["summary fragments"].append(asset_path(item["summary_file"]))
+            if item.get("changes_file"):
+                assets["changes"].append(asset_path(item["changes_file"]))
+    return {name: [os.path.join(ROOT_DIR, path) for path in paths if os.path.exists(os.path.join(ROOT_DIR, path))]
+            for name, paths in assets.items()}
+
+def precompress_assets(manifest, workers=None):
+    """Writes gzip and Brotli sidecars for every text asset and reports the savings per asset class"""
+    if brotli is None:
+        print("Brotli is not installed (pip install brotli); writing gzip sidecars only")
+    assets = text_assets(manifest)
+    rewritten = 0
+    report = []
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for name, paths in assets.items():
+            results = list(pool.map(compress_asset, paths))
+            rewritten += sum(result[4] for result in results)
+            raw = sum(result[1] for result in results)
+            gz = sum(result[2] for result in results)
+            br = sum(result[3] for result in results) if brotli is not None else None
+            report.append((name, len(results), raw, gz, br))
+
+    print(f"Precompressed text assets ({rewritten} of {sum(len(p) for p in assets.values())} files updated)")
+    print(f"  {'asset class':<20}{'files':>7}{'raw KB':>11}{'gzip KB':>17}{'brotli KB':>17}")
+    for name, count, raw, gz, br in report:
+        if not count:
+            continue
+        gz_col = f"{gz / 1024:.1f} ({100 - 100 * gz / raw:.0f}%)" if raw else "-"
+        br_col = f"{br / 1024:.1f} ({100 - 100 * br / raw:.0f}%)" if raw and br is not None else "-"
+        print(f"  {name:<20}{count:>7}{raw / 1024:>11.1f}{gz_col:>17}{br_col:>17}")
+
+def generate_cache_headers():
+    """Writes the _headers file: revalidate the shell and root index, cache hashed assets forever"""
+    immutable = "  Cache-Control: public, max-age=31536000, immutable"
+    revalidate = "  Cache-Control: no-cache"
+    lines = ["/", revalidate, "/index.html", revalidate, f"/{MANIFEST_FILE}", revalidate, f"/{CHANGES_FEED_FILE}", revalidate,
+             f"/{SERVICE_WORKER_FILE}", revalidate,
+             f"/{MANIFEST_SHARD_DIR}/*", immutable, f"/{RENDERER_DIR}/*", immutable, f"/{BLOB_DIR}/*", immutable, f"/{PACK_DIR}/*", immutable,
+             f"/{SPRITE_DIR}/*", immutable]
+    for strategy in STRATEGIES:
+        for sub in DATE_SUBFOLDERS:
+            lines += [f"/{strategy}/:date/{sub}/*", immutable]
+    write_output(HEADERS_FILE, "\n".join(lines) + "\n")
+    print(f"Generated {HEADERS_FILE}")
+
+def generate_manifest(use_cache=True, threads=SCAN_THREADS, stages=(), dirty=None):
+    """Scans directories and builds the manifest index and shards, rescanning only new or modified dates
+    Each stage is called with the in-memory manifest before it is written and may annotate date entries.
+    With dirty (a set of "strategy/date" keys, from watch mode) only those dates are rescanned; the
+    others reuse their cached entries without being checked."""
+    manifest = {}
+    cached_dates = load_build_cache() if use_cache else {}
+    fresh_cache = {}
+    rescanned = 0
+    
+    with PROFILER.phase("scan"), ThreadPoolExecutor(max_workers=max(1, threads)) as pool:
+        strategy_paths = [os.path.join(ROOT_DIR, strategy) for strategy in STRATEGIES]
+        strategy_listings = dict(zip(STRATEGIES, pool.map(scan_folder, strategy_paths)))
+        
+        # Fan out one scan per date folder across all strategies
+        pending = []
+        for strategy in STRATEGIES:
+            listing = strategy_listings[strategy]
+            if listing is None:
+                continue
+                
+            manifest[strategy] = {
+                "name": STRATEGY_DESCRIPTIONS.get(strategy, {}).get("title", strategy),
+                "description": STRATEGY_DESCRIPTIONS.get(strategy, {}).get("description", "No description available."),
+                "dates": []
+            }
+            
+            for date_entry in listing:
+                if not date_entry.is_dir() or date_entry.name in ["output", "forward", ".git"]:
+                    continue
+                cache_key = f"{strategy}/{date_entry.name}"
+                cached = cached_dates.get(cache_key)
+                if dirty is not None and cached and cache_key not in dirty:
+                    future = Future()
+                    future.set_result((cached["fingerprint"], cached["entry"], False))
+                else:
+                    # A dirty date may have plots rewritten in place, which its fingerprint would miss
+                    future = pool.submit(scan_date_folder, strategy, date_entry, None if dirty else cached)
+                pending.append((strategy, cache_key, future))
+        
+        for strategy, cache_key, future in pending:
+            fingerprint, entry, was_rescanned = future.result()
+            if fingerprint is None:
+                continue
+            fresh_cache[cache_key] = {"fingerprint": fingerprint, "entry": entry}
+            rescanned += was_rescanned
+            if entry:
+                manifest[strategy]["dates"].append(entry)
+
+    # Sort dates descending
+    for strategy_data in manifest.values():
+        strategy_data["dates"].sort(key=lambda x: x["date"], reverse=True)
+
+    for stage in stages:
+        with PROFILER.phase(stage_name(stage)):
+            stage(manifest)
+
+    # Write manifest
+    with PROFILER.phase("write_manifest"):
+        write_manifest(manifest)
+        save_build_cache(fresh_cache)
+    print(f"Generated {MANIFEST_FILE} ({rescanned} of {len(fresh_cache)} date folders rescanned)")
+    return manifest
+
+def generate_service_worker(shell_html):
+    """Generates the service worker that precaches the shell and caches reports and plots"""
+    template = """// Generated by update_site.py -- do not edit.
+// Cache names carry the build version, so activating a new build evicts the old shell and data caches.
+const VERSION = "__VERSION__";
+const SHELL_CACHE = `shell-${VERSION}`;
+const DATA_CACHE = `data-${VERSION}`;
+// Content-addressed (?v=<hash>) reports, shards, fragments and plots never change, so they outlive builds;
+// a new hash for the same path replaces the old entry instead.
+const ASSET_CACHE = "assets";
+const PRECACHE = __PRECACHE__;
+
+self.addEventListener("install", event => {
+    event.waitUntil(caches.open(SHELL_CACHE).then(cache => cache.addAll(PRECACHE)).then(() => self.skipWaiting()));
+});
+
+self.addEventListener("activate", event => {
+    const keep = [SHELL_CACHE, DATA_CACHE, ASSET_CACHE];
+    event.waitUntil(caches.keys()
+        .then(names => Promise.all(names.filter(name => !keep.includes(name)).map(name => caches.delete(name))))
+        .then(() => self.clients.claim()));
+});
+
+// Shell: cache-first, falling back to the network for pages outside the precache
+async function shellFirst(request) {
+    const cached = await caches.match(request, { cacheName: SHELL_CACHE, ignoreSearch: true });
+    return cached || fetch(request);
+}
+
+// Hashed assets: cache-first; older versions of the same path are dropped when a new one is stored
+async function cacheFirst(request) {
+    const cache = await caches.open(ASSET_CACHE);
+    const cached = await cache.match(request);
+    if (cached) return cached;
+    const response = await fetch(request);
+    if (response.ok) {
+        const stale = await cache.keys(request, { ignoreSearch: true });
+        await Promise.all(stale.map(key => cache.delete(key)));
+        await cache.put(request, response.clone());
+    }
+    return response;
+}
+
+// Root manifest, search shards and CDN stylesheets: answer from cache, refresh in the background
+async function staleWhileRevalidate(event) {
+    const cache = await caches.open(DATA_CACHE);
+    const cached = await cache.match(event.request, { ignoreVary: true });
+    const refresh = fetch(event.request).then(response => {
+        if (response.ok || response.type === "opaque") cache.put(event.request, response.clone());
+        return response;
+    });
+    if (cached) {
+        event.waitUntil(refresh.catch(() => {}));
+        return cached;
+    }
+    return refresh;
+}
+
+self.addEventListener("fetch", event => {
+    const request = event.request;
+    // Range requests (plots inside archival packs) go straight to the network; partial responses cannot be cached
+    if (request.method !== "GET" || request.headers.has("range")) return;
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) {
+        event.respondWith(staleWhileRevalidate(event));
+    } else if (request.mode === "navigate" || PRECACHE.includes(url.pathname.split("/").pop() || "./")) {
+        event.respondWith(shellFirst(request));
+    } else if (url.searchParams.has("v")) {
+        event.respondWith(cacheFirst(request));
+    } else {
+        event.respondWith(staleWhileRevalidate(event));
+    }
+});
+"""
+    precache = ["./", "index.html"] + [f"{page}.html" for page in LEGAL_PAGES]
+    digest = hashlib.sha256(template.encode())
+    digest.update(shell_html.encode())
+    for page in LEGAL_PAGES:
+        with open(f"{page}.html", "rb") as f:
+            digest.update(f.read())
+    version = digest.hexdigest()[:HASH_LENGTH]
+    worker = template.replace("__VERSION__", version).replace("__PRECACHE__", json.dumps(precache))
+    write_output(SERVICE_WORKER_FILE, worker)
+    print(f"Generated {SERVICE_WORKER_FILE} (cache version {version})")
+
+def generate_renderer_modules():
+    """Writes the strategy renderer modules to js/; returns each strategy's module URL and tabs for the shell
+    table.js holds the shared table code; the strategy modules import it by its versioned URL."""
+    table = """// Generated by update_site.py -- do not edit.
+// Summary tables shared by the strategy renderers. Column headers, classes and cell formatters are worked out
+// once per column. Rows are built in chunks through a DocumentFragment, and long tables keep only the rows in
+// view in the DOM.
+const TABLE_EXCLUDED_COLUMNS = __TABLE_EXCLUDED_COLUMNS__;
+const HEADER_OVERRIDES = __HEADER_OVERRIDES__;
+const VIRTUAL_ROW_THRESHOLD = 100; // Longer tables render only the visible rows
+const RENDER_CHUNK_ROWS = 50;
+const VIRTUAL_OVERSCAN_ROWS = 10;
+
+function stopsText(val) {
+    const sl = val.stop_loss ? val.stop_loss.toFixed(2) : 'N/A';
+    const tp = val.take_profit ? val.take_profit.toFixed(2) : 'N/A';
+    const slPct = val.stop_loss_pct ? `(${val.stop_loss_pct.toFixed(0)})` : '';
+    const tpPct = val.take_profit_pct ? `(${val.take_profit_pct.toFixed(0)})` : '';
+    return `SL ${slPct}: ${sl} | TP ${tpPct}: ${tp}`;
+}
+
+// Unwraps nested indicator objects to the value shown in the cell
+function cellValueGetter(key) {
+    switch (key) {
+        case 'rsi':
+        case 'trend':
+        case 'mtf_trend':
+        case 'adx':
+            return val => (val && typeof val === 'object' && val.status) ? val.status : val;
+        case 'macd':
+            return val => (val && typeof val === 'object' && val.crossover) ? val.crossover : val;
+        case 'divergence':
+            return val => (val && typeof val === 'object') ? (val.bullish ? "Bullish" : val.bearish ? "Bearish" : "None") : val;
+        case 'stops':
+            return val => (val && typeof val === 'object') ? stopsText(val) : val;
+        default:
+            return val => val;
+    }
+}
+
+// config (all optional): excluded columns on top of TABLE_EXCLUDED_COLUMNS, a headerMap fixing the columns
+// and their labels, the alwaysVisible columns (the rest hide on small screens) and an actionColumn to colour
+function buildColumns(rows, config) {
+    const excluded = TABLE_EXCLUDED_COLUMNS.concat(config.excluded || []);
+    const headerMap = config.headerMap;
+    const headers = headerMap ? Object.keys(headerMap) : Object.keys(rows[0]).filter(h => !excluded.includes(h));
+    
+    return headers.map(h => {
+        const key = h.toLowerCase();
+        const getValue = cellValueGetter(key);
+        const signalCell = h === 'Signal';
+        const actionCell = key === config.actionColumn;
+        return {
+            key: h,
+            label: (headerMap && headerMap[h]) || HEADER_OVERRIDES[key] || h.replace(/_/g, " "),
+            cls: (config.alwaysVisible && !config.alwaysVisible.includes(key)) ? "w3-hide-small" : "",
+            format: raw => {
+                let val = getValue(raw);
+                if (Array.isArray(val)) val = val.join(', ');
+                if (signalCell && val) val = `<span class="signal-${val}">${val}</span>`;
+                if (actionCell && val) {
+                    const signalClass = val.split(' ')[0].replace(/[^a-zA-Z]/g, ''); // Extract BUY from BUY (VOL BLOCKED)
+                    val = `<span class="signal-${signalClass}">${val}</span>`;
+                }
+                if (val === null || val === undefined) return "";
+                if (typeof val === 'object') return JSON.stringify(val); // Fallback to avoid [object Object]
+                if (typeof val === 'number') return val.toFixed(2);
+                return String(val);
+            },
+            sortKey: raw => {
+                let val = getValue(raw);
+                if (typeof val === 'number') return val;
+                if (Array.isArray(val)) val = val.join(', ');
+                if (val === null || val === undefined) return "";
+                return (typeof val === 'object' ? JSON.stringify(val) : String(val)).toLowerCase();
+            }
+        };
+    });
+}
+
+function rowCellsHtml(columns, row) {
+    let html = "";
+    for (const col of columns) {
+        html += col.cls ? `<td class="${col.cls}">${col.format(row[col.key])}</td>` : `<td>${col.format(row[col.key])}</td>`;
+    }
+    return html;
+}
+
+// Static table markup (used for the small per-ticker tables of the Momentum strategy)
+export function tableHtml(rows, config) {
+    if (!rows || rows.length === 0) return "<p>No data available.</p>";
+    const columns = buildColumns(rows, config);
+    const head = columns.map(c => c.cls ? `<th class="${c.cls}">${c.label}</th>` : `<th>${c.label}</th>`).join('');
+    const body = rows.map(row => `<tr>${rowCellsHtml(columns, row)}</tr>`).join('');
+    return `<table class="analysis-table w3-table-all w3-hoverable"><thead><tr class="w3-light-grey">${head}</tr></thead><tbody>${body}</tbody></table>`;
+}
+
+function compareKeys(a, b) {
+    if (typeof a === typeof b) return a < b ? -1 : a > b ? 1 : 0;
+    return typeof a === 'number' ? -1 : 1; // Numbers before text
+}
+
+// Interactive table with client-side sort (click a header) and filter; no full rebuilds
+export function mountDataTable(container, rows, config, initial) {
+    if (!rows || rows.length === 0) {
+        container.innerHTML = "<p>No data available.</p>";
+        return;
+    }
+    const columns = buildColumns(rows, config);
+    const virtual = rows.length > VIRTUAL_ROW_THRESHOLD;
+    const rowHtml = new Array(rows.length);   // Cell markup, built the first time a row is shown
+    const sortKeys = new Array(columns.length); // Per-column sort keys, built on first sort
+    let rowText = null;                       // Plain row text for filtering, built on first filter
+    let view = rows.map((_, i) => i);
+    let sortCol = -1, sortDir = 1, filterText = "";
+    let rowHeight = 0, renderToken = 0, scrollPending = false;
+    
+    const toolbar = document.createElement("div");
+    toolbar.className = "table-toolbar";
+    const filterInput = document.createElement("input");
+    filterInput.className = "w3-input w3-border w3-small";
+    filterInput.type = "search";
+    filterInput.placeholder = "Filter rows...";
+    filterInput.setAttribute("aria-label", "Filter rows");
+    const counter = document.createElement("span");
+    counter.className = "w3-small w3-text-grey";
+    toolbar.append(filterInput, counter);
+    
+    const scroller = document.createElement("div");
+    scroller.className = virtual ? "table-scroll" : "";
+    scroller.style.overflowX = "auto";
+    const table = document.createElement("table");
+    table.className = "analysis-table w3-table-all w3-hoverable" + (virtual ? " virtual" : "");
+    const thead = document.createElement("thead");
+    const headRow = document.createElement("tr");
+    headRow.className = "w3-light-grey";
+    const headCells = columns.map((col, i) => {
+        const th = document.createElement("th");
+        if (col.cls) th.className = col.cls;
+        th.innerHTML = col.label;
+        th.title = "Sort";
+        th.onclick = () => sortBy(i);
+        headRow.appendChild(th);
+        return th;
+    });
+    thead.appendChild(headRow);
+    const tbody = document.createElement("tbody");
+    table.append(thead, tbody);
+    scroller.appendChild(table);
+    
+    function rowElement(i) {
+        const tr = document.createElement("tr");
+        tr.innerHTML = rowHtml[i] || (rowHtml[i] = rowCellsHtml(columns, rows[i]));
+        return tr;
+    }
+    
+    function spacer(height) {
+        const tr = document.createElement("tr");
+        tr.className = "table-spacer";
+        tr.innerHTML = `<td colspan="${columns.length}" style="height:${height}px"></td>`;
+        return tr;
+    }
+    
+    // Short tables: append every row, one chunk per animation frame
+    function renderAll() {
+        const token = ++renderToken;
+        tbody.textContent = "";
+        let start = 0;
+        (function chunk() {
+            if (token !== renderToken) return;
+            const frag = document.createDocumentFragment();
+            const end = Math.min(start + RENDER_CHUNK_ROWS, view.length);
+            for (let i = start; i < end; i++) frag.appendChild(rowElement(view[i]));
+            tbody.appendChild(frag);
+            start = end;
+            if (start < view.length) requestAnimationFrame(chunk);
+        })();
+    }
+    
+    // Long tables: only the rows inside the scroll viewport (plus overscan) are in the DOM
+    function renderWindow() {
+        scrollPending = false;
+        if (!rowHeight) {
+            tbody.textContent = "";
+            if (view.length === 0) return;
+            tbody.appendChild(rowElement(view[0]));
+            rowHeight = tbody.firstChild.getBoundingClientRect().height || 40;
+        }
+        const first = Math.max(0, Math.floor(scroller.scrollTop / rowHeight) - VIRTUAL_OVERSCAN_ROWS);
+        const count = Math.ceil(scroller.clientHeight / rowHeight) + 2 * VIRTUAL_OVERSCAN_ROWS;
+        const last = Math.min(view.length, first + count);
+        const frag = document.createDocumentFragment();
+        frag.appendChild(spacer(first * rowHeight));
+        for (let i = first; i < last; i++) frag.appendChild(rowElement(view[i]));
+        frag.appendChild(spacer((view.length - last) * rowHeight));
+        tbody.textContent = "";
+        tbody.appendChild(frag);
+    }
+    
+    function render() {
+        counter.textContent = `${view.length} of ${rows.length} rows`;
+        if (virtual) {
+            scroller.scrollTop = 0;
+            renderWindow();
+        } else {
+            renderAll();
+        }
+    }
+    
+    function refresh() {
+        view = rows.map((_, i) => i);
+        if (filterText) {
+            if (!rowText) {
+                rowText = rows.map(row => columns.map(c => c.format(row[c.key])).join(" ").replace(/<[^>]*>/g, "").toLowerCase());
+            }
+            view = view.filter(i => rowText[i].includes(filterText));
+        }
+        if (sortCol >= 0) {
+            const col = columns[sortCol];
+            const keys = sortKeys[sortCol] || (sortKeys[sortCol] = rows.map(row => col.sortKey(row[col.key])));
+            view.sort((a, b) => compareKeys(keys[a], keys[b]) * sortDir || a - b);
+        }
+        render();
+    }
+    
+    function sortBy(i) {
+        sortDir = sortCol === i ? -sortDir : 1;
+        sortCol = i;
+        headCells.forEach((th, j) => th.innerHTML = columns[j].label + (j === i ? (sortDir > 0 ? " &#9650;" : " &#9660;") : ""));
+        refresh();
+    }
+    
+    let filterTimer = null;
+    filterInput.oninput = () => {
+        clearTimeout(filterTimer);
+        filterTimer = setTimeout(() => {
+            filterText = filterInput.value.trim().toLowerCase();
+            refresh();
+        }, 150);
+    };
+    if (virtual) {
+        scroller.addEventListener("scroll", () => {
+            if (!scrollPending) {
+                scrollPending = true;
+                requestAnimationFrame(renderWindow);
+            }
+        }, { passive: true });
+    }
+    
+    container.textContent = "";
+    container.append(toolbar, scroller);
+    if (initial && initial.filter) {
+        filterInput.value = initial.filter;
+        filterText = initial.filter.trim().toLowerCase();
+    }
+    if (initial && initial.sortCol >= 0) sortBy(initial.sortCol);
+    else refresh();
+    if (initial && initial.focusFilter) filterInput.focus();
+}
+
+// The pre-rendered table paints first; sorting or filtering swaps in the interactive table
+export function enhanceSummaryTable(summaryDiv, dateItem, config) {
+    const table = summaryDiv.querySelector("table.analysis-table");
+    if (!table || !dateItem.output_file) return;
+    
+    const host = document.createElement("div");
+    table.replaceWith(host);
+    const toolbar = document.createElement("div");
+    toolbar.className = "table-toolbar";
+    toolbar.innerHTML = '<input class="w3-input w3-border w3-small" type="search" placeholder="Filter rows..." aria-label="Filter rows">';
+    host.append(toolbar, table);
+    
+    // Input typed or sorts clicked while the data loads are carried over to the interactive table
+    const filterInput = toolbar.querySelector("input");
+    let pendingSort = -1;
+    let upgrading = null;
+    const upgrade = () => {
+        if (upgrading) return;
+        upgrading = fetch(dateItem.output_file).then(res => res.json()).then(json => {
+            const rows = Array.isArray(json) ? json : [json];
+            const focusFilter = document.activeElement === filterInput;
+            mountDataTable(host, rows, config, { filter: filterInput.value, sortCol: pendingSort, focusFilter: focusFilter });
+        }).catch(e => {
+            upgrading = null;
+            console.error("Failed to load table data", e);
+        });
+    };
+    
+    filterInput.oninput = upgrade;
+    table.querySelectorAll("th").forEach((th, i) => {
+        th.title = "Sort";
+        th.onclick = () => {
+            pendingSort = i;
+            upgrade();
+        };
+    });
+}
+
+// Summary built in the browser, for dates without a pre-rendered fragment
+export function renderTable(summaryDiv, json, dateItem, config, shell) {
+    // Handle array or single dict wrap
+    const data = Array.isArray(json) ? json : [json];
+    summaryDiv.innerHTML = shell.downloadLinkHtml(dateItem);
+    const host = document.createElement("div");
+    summaryDiv.appendChild(host);
+    mountDataTable(host, data, config);
+}
+"""
+    modules = {
+        "dma": """// Generated by update_site.py -- do not edit.
+// DMA family: every output.json column but the excluded ones, in file order
+import { enhanceSummaryTable, renderTable } from __TABLE_MODULE__;
+
+const COLUMNS = {};
 
-<div class="w3-content w3-white w3-card w3-padding-large" style="max-width:800px;margin-top:20px;margin-bottom:20px">
-    <h1>{title}</h1>
-    <hr>
-    {content}
-</div>
+export function enhance(summaryDiv, dateItem) {
+    enhanceSummaryTable(summaryDiv, dateItem, COLUMNS);
+}
 
-<footer class="w3-container w3-padding-16 w3-center w3-light-grey">
-    <p><a href="index.html">Home</a> | <a href="privacy.html">Privacy</a> | <a href="terms.html">Terms</a> | <a href="about.html">About</a> | <a href="contact.html">Contact</a></p>
-</footer>
+export function render(summaryDiv, json, dateItem, shell) {
+    renderTable(summaryDiv, json, dateItem, COLUMNS, shell);
+}
+""",
+        "pv": """// Generated by update_site.py -- do not edit.
+// Peak Valley (US): a fixed set of columns, the secondary ones hidden on small screens
+import { enhanceSummaryTable, renderTable } from __TABLE_MODULE__;
 
-</body>
-</html>
-"""
-    for page, data in LEGAL_PAGES.items():
-        html = template.format(title=data["title"], content=data["content"])
-        with open(f"{page}.html", "w") as f:
-            f.write(html)
-    print("Generated legal pages")
+const COLUMNS = {
+    excluded: __PV_EXCLUDED_COLUMNS__,
+    headerMap: __PV_HEADER_MAP__,
+    alwaysVisible: __PV_ALWAYS_VISIBLE__,
+    actionColumn: "action"
+};
 
-def generate_manifest():
-    """Scans directories and builds the manifest.json"""
-    manifest = {}
+export function enhance(summaryDiv, dateItem) {
+    enhanceSummaryTable(summaryDiv, dateItem, COLUMNS);
+}
+
+export function render(summaryDiv, json, dateItem, shell) {
+    renderTable(summaryDiv, json, dateItem, COLUMNS, shell);
+}
+""",
+        "m": """// Generated by update_site.py -- do not edit.
+// Momentum (US): the summary plots, then one card per scanned ticker with its table and livetest plot.
+import { tableHtml } from __TABLE_MODULE__;
+
+export function render(summaryDiv, json, dateItem, shell) {
+    const pictureHtml = shell.pictureHtml;
+    let mHtml = "";
     
-    for strategy in STRATEGIES:
-        strategy_path = os.path.join(ROOT_DIR, strategy)
-        if not os.path.isdir(strategy_path):
-            continue
-            
-        manifest[strategy] = {
-            "name": STRATEGY_DESCRIPTIONS.get(strategy, {}).get("title", strategy),
-            "description": STRATEGY_DESCRIPTIONS.get(strategy, {}).get("description", "No description available."),
-            "dates": []
-        }
-        
-        dates_data = []
-        for date_folder in os.listdir(strategy_path):
-            full_path = os.path.join(strategy_path, date_folder)
-            if not os.path.isdir(full_path) or date_folder in ["output", "forward", ".git"]:
-                continue
-                
-            # Check for data
-            output_dir = os.path.join(full_path, "output")
-            forward_dir = os.path.join(full_path, "forward")
-            backward_dir = os.path.join(full_path, "backward")
-            
-            output_json = os.path.join(output_dir, "output.json")
-            has_output = os.path.exists(output_json)
-            
-            forward_images = []
-            if os.path.isdir(forward_dir):
-                for img in sorted(glob.glob(os.path.join(forward_dir, "*.png"))):
-                    forward_images.append(os.path.basename(img))
-
-            backward_images = []
-            if os.path.isdir(backward_dir):
-                for img in sorted(glob.glob(os.path.join(backward_dir, "*.png"))):
-                    backward_images.append(os.path.basename(img))
-                    
-            output_images = []
-            if os.path.isdir(output_dir):
-                for img in sorted(glob.glob(os.path.join(output_dir, "*.png"))):
-                    output_images.append(os.path.basename(img))
-            
-            if has_output or forward_images or backward_images or output_images:
-                dates_data.append({
-                    "date": date_folder,
-                    "has_output": has_output,
-                    "output_file": f"{strategy}/{date_folder}/output/output.json" if has_output else None,
-                    "forward_images": [f"{strategy}/{date_folder}/forward/{img}" for img in forward_images],
-                    "backward_images": [f"{strategy}/{date_folder}/backward/{img}" for img in backward_images],
-                    "output_images": [f"{strategy}/{date_folder}/output/{img}" for img in output_images]
-                })
-
-        # Sort dates descending
-        dates_data.sort(key=lambda x: x["date"], reverse=True)
-        manifest[strategy]["dates"] = dates_data
+    const scanSummaryImg = dateItem.output_images && dateItem.output_images.find(img => img.includes("scan_results_summary.png"));
+    const histSummaryImg = dateItem.output_images && dateItem.output_images.find(img => img.includes("historical_context_summary.png"));
+    
+    if (scanSummaryImg || histSummaryImg) {
+        mHtml += '<div class="gallery-grid">';
+        if (scanSummaryImg) mHtml += `<div class="gallery-item">${pictureHtml(scanSummaryImg, dateItem, "Scan Results Summary")}</div>`;
+        if (histSummaryImg) mHtml += `<div class="gallery-item">${pictureHtml(histSummaryImg, dateItem, "Historical Context Summary")}</div>`;
+        mHtml += '</div><hr>';
+    }
+    
+    const scanResults = json.scan_results || [];
+    const histContext = json.historical_context || {};
+    
+    if (scanResults.length > 0) {
+        mHtml += '<h3>Ticker Data</h3>';
+        scanResults.forEach(item => {
+            const ticker = item.Ticker;
+            mHtml += `<div class="w3-card w3-margin-bottom w3-padding">`;
+            mHtml += `<h4><b>${ticker}</b></h4>`;
+            mHtml += '<div class="w3-row-padding">';
+            mHtml += '<div class="w3-twothird" style="overflow-x:auto;">';
+            const tickerHist = histContext[ticker] || {};
+            const mergedData = { ...item, ...tickerHist };
+            mHtml += tableHtml([mergedData], {});
+            mHtml += '</div>';
+            mHtml += '<div class="w3-third">';
+            const livetestImg = dateItem.output_images && dateItem.output_images.find(img => img.includes(`${ticker}_livetest.png`));
+            if (livetestImg) {
+                mHtml += `<div class="gallery-item">${pictureHtml(livetestImg, dateItem, `${ticker} Livetest`, true, "max-width:100%")}</div>`;
+            } else {
+                mHtml += `<p>No plot available for ${ticker}.</p>`;
+            }
+            mHtml += '</div></div></div>';
+        });
+    } else {
+        mHtml += "<p>No data found.</p>";
+    }
+    summaryDiv.innerHTML = mHtml;
+    shell.observeLazyImages(summaryDiv);
+}
+"""
+    }
+    constants = {
+        "__TABLE_EXCLUDED_COLUMNS__": TABLE_EXCLUDED_COLUMNS,
+        "__HEADER_OVERRIDES__": HEADER_OVERRIDES,
+        "__PV_EXCLUDED_COLUMNS__": PV_EXCLUDED_COLUMNS,
+        "__PV_HEADER_MAP__": PV_HEADER_MAP,
+        "__PV_ALWAYS_VISIBLE__": PV_ALWAYS_VISIBLE
+    }
 
-    # Write manifest
-    with open("manifest.json", "w") as f:
-        json.dump(manifest, f, indent=2)
-    print("Generated manifest.json")
-    return manifest
+    def write_module(name, source):
+        for placeholder, value in constants.items():
+            source = source.replace(placeholder, json.dumps(value))
+        path = os.path.join(RENDERER_DIR, f"{name}.js")
+        write_output(path, source)
+        return versioned_url(f"{RENDERER_DIR}/{name}.js", path)
 
-def generate_app_shell():
+    os.makedirs(RENDERER_DIR, exist_ok=True)
+    constants["__TABLE_MODULE__"] = "./" + write_module("table", table).split("/", 1)[1]
+    urls = {name: write_module(name, source) for name, source in modules.items()}
+    # Modules dropped from the registry would otherwise linger
+    for name in map(sidecar_source, os.listdir(RENDERER_DIR)):
+        if name.endswith(".js") and name[:-3] not in modules and name != "table.js":
+            remove_output(os.path.join(RENDERER_DIR, name))
+    print(f"Generated {len(modules) + 1} renderer modules in {RENDERER_DIR}/")
+    # import() treats "js/dma.js" as a bare package name, so the specifiers must be relative to the page
+    return {strategy: {"module": "./" + urls[STRATEGY_RENDERERS[strategy]["module"]], "tabs": STRATEGY_RENDERERS[strategy]["tabs"]}
+            for strategy in STRATEGIES}
+
+def generate_app_shell(vendor_styles=None):
     """Generates the main index.html file"""
     html_content = """<!DOCTYPE html>
 <html lang="en">
@@ -210,6 +2452,11 @@ def generate_app_shell():
         .analysis-table th, .analysis-table td { padding: 10px; text-align: left; border-bottom: 1px solid #ddd; }
         .analysis-table th { background-color: #f1f1f1; cursor: pointer; }
         .analysis-table tr:hover { background-color: #f5f5f5; }
+        .table-toolbar { display: flex; align-items: center; gap: 10px; max-width: 400px; }
+        .table-scroll { max-height: 70vh; overflow-y: auto; }
+        .table-scroll thead th { position: sticky; top: 0; z-index: 1; }
+        .analysis-table.virtual td { white-space: nowrap; }
+        .analysis-table .table-spacer td { padding: 0; border: 0; }
         
         /* Signal Colors */
         .signal-Buy, .signal-BUY { color: green; font-weight: bold; }
@@ -219,6 +2466,8 @@ def generate_app_shell():
         /* Gallery */
         .gallery-grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(600px, 1fr)); gap: 20px; padding: 20px 0; }
         .gallery-item img { width: 100%; border-radius: 4px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }
+        .gallery-item img[data-src] { aspect-ratio: 16 / 9; background: #f1f1f1; }
+        .sprite-tile { width: 100%; border-radius: 4px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); background-color: #f1f1f1; background-repeat: no-repeat; cursor: pointer; }
         
         @media (max-width: 992px) {
             #main-content { margin-left: 0; }
@@ -287,8 +2536,6 @@ def generate_app_shell():
             to {bottom: 0; opacity: 0;}
         }
 
-        /* Force X icon color */
-        .fa-x-twitter { color: #ffffff !important; }
     </style>
 </head>
 <body class="w3-light-grey">
@@ -326,6 +2573,9 @@ def generate_app_shell():
   <hr>
   <div class="w3-container">
     <h5>Dashboard</h5>
+    <form id="search-form" onsubmit="searchTicker(event)">
+      <input id="search-input" class="w3-input w3-border w3-small w3-margin-bottom" type="search" placeholder="Search ticker (e.g. AAPL)" autocomplete="off" aria-label="Search ticker">
+    </form>
   </div>
   <div class="w3-bar-block" id="nav-container">
     <a href="#" class="w3-bar-item w3-button w3-padding-16 w3-hide-large w3-dark-grey w3-hover-black" onclick="w3_close()" title="close menu"><i class="fa-solid fa-xmark fa-fw"></i>  Close Menu</a>
@@ -345,12 +2595,16 @@ def generate_app_shell():
     <h5><b><span id="page-title">Select a Strategy</span></b></h5>
   </header>
 
+  <div id="search-results" class="w3-container hidden"></div>
+
   <div id="dashboard-content" class="w3-container hidden">
       
       <div class="w3-panel w3-white w3-card w3-display-container">
           <p id="strategy-desc" class="w3-text-grey"></p>
       </div>
 
+      <div id="changes-panel" class="w3-panel w3-pale-yellow w3-leftbar w3-border-yellow hidden"></div>
+
       <div class="w3-bar w3-black">
         <button class="w3-bar-item w3-button tablink w3-red" onclick="openTab(event,'Summary')">Summary</button>
         <button class="w3-bar-item w3-button tablink" id="btn-forward" onclick="openTab(event,'Forward')">Forward Testing</button>
@@ -372,6 +2626,7 @@ def generate_app_shell():
   
   <div id="placeholder-msg" class="w3-container w3-padding-32 w3-center">
       <h3><i class="fa-solid fa-arrow-left"></i> Reports are updated every day. Click a date (last 10 days) in the sidebar to view reports.</h3>
+      <div id="changes-feed"></div>
   </div>
 
   <!-- Footer -->
@@ -412,17 +2667,29 @@ def generate_app_shell():
 <script>
 // Global Data
 let manifest = {};
+// Manifest shards already fetched, keyed by shard URL
+const shardCache = {};
+// "strategy/date" of the report on screen, so late responses for an earlier one are dropped
+let currentReport = null;
 
 // Init
 window.onload = async function() {
     try {
-        const response = await fetch('manifest.json?v=' + new Date().getTime());
+        // The root index is the only file that must be revalidated on every visit
+        const response = await fetch('manifest.json', { cache: 'no-cache' });
         manifest = await response.json();
         renderSidebar();
+        watchPrefetchIntent();
+        watchSearchResults();
+        loadChangesFeed();
     } catch (e) {
         console.error("Failed to load manifest", e);
         document.getElementById("nav-container").innerHTML = "<div class='w3-padding w3-text-red'>Error loading data.</div>";
     }
+    // Past reports and plots are served from the service worker's cache on later visits
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.register('sw.js').catch(e => console.warn("Service worker registration failed", e));
+    }
 };
 
 // Sidebar Rendering
@@ -434,7 +2701,7 @@ function renderSidebar() {
     container.innerHTML += '<a href="#" class="w3-bar-item w3-button w3-padding-16 w3-hide-large w3-dark-grey w3-hover-black" onclick="w3_close()" title="close menu"><i class="fa-solid fa-xmark fa-fw"></i> Close Menu</a>';
     
     for (const [key, strategy] of Object.entries(manifest)) {
-        if (!strategy.dates || strategy.dates.length === 0) continue;
+        if (!strategy.months || strategy.months.length === 0) continue;
         
         // Strategy Header (Accordion Trigger)
         const btn = document.createElement("button");
@@ -446,33 +2713,214 @@ function renderSidebar() {
         
         container.appendChild(btn);
         
-        // Dates Container
-        const dateDiv = document.createElement("div");
-        dateDiv.id = divId;
-        dateDiv.className = "w3-hide w3-white w3-card-4";
+        // Months Container
+        const monthsDiv = document.createElement("div");
+        monthsDiv.id = divId;
+        monthsDiv.className = "w3-hide w3-white w3-card-4";
         
-        strategy.dates.forEach(item => {
-            const link = document.createElement("a");
-            link.href = "#";
-            link.className = "w3-bar-item w3-button w3-padding-small";
-            link.style.paddingLeft = "24px"; // Indent
-            link.innerHTML = `<i class="fa-solid fa-calendar fa-fw"></i> ${item.date}`;
-            link.onclick = (e) => {
-                e.preventDefault();
-                loadReport(key, item);
-                
-                // Active state
-                document.querySelectorAll(".w3-bar-item").forEach(el => el.classList.remove("nav-active"));
-                link.classList.add("nav-active");
-                
-                // On mobile, close sidebar after selection
-                w3_close();
+        strategy.months.forEach(monthInfo => {
+            // Month Header (collapsed; dates are rendered on first expand)
+            const monthBtn = document.createElement("button");
+            monthBtn.className = "w3-button w3-block w3-left-align w3-hover-light-grey";
+            monthBtn.style.paddingLeft = "24px"; // Indent
+            monthBtn.innerHTML = `<i class="fa-solid fa-folder fa-fw"></i> ${formatMonth(monthInfo.month)} <i class="fa-solid fa-caret-down"></i>`;
+            
+            const monthDivId = `nav-${key}-${monthInfo.month}`;
+            const dateDiv = document.createElement("div");
+            dateDiv.id = monthDivId;
+            dateDiv.className = "w3-hide";
+            
+            monthBtn.onclick = () => {
+                if (!dateDiv.hasChildNodes()) renderMonthDates(key, monthInfo, dateDiv);
+                myAccFunc(monthDivId);
             };
-            dateDiv.appendChild(link);
+            
+            monthsDiv.appendChild(monthBtn);
+            monthsDiv.appendChild(dateDiv);
         });
         
-        container.appendChild(dateDiv);
+        container.appendChild(monthsDiv);
+    }
+}
+
+function renderMonthDates(key, monthInfo, dateDiv) {
+    monthInfo.dates.forEach(date => {
+        const link = document.createElement("a");
+        link.href = "#";
+        link.className = "w3-bar-item w3-button w3-padding-small";
+        link.style.paddingLeft = "40px"; // Indent
+        link.innerHTML = `<i class="fa-solid fa-calendar fa-fw"></i> ${date}`;
+        link.dataset.strategy = key;
+        link.dataset.date = date;
+        link.onclick = (e) => {
+            e.preventDefault();
+            loadReport(key, monthInfo, date);
+            
+            // Active state
+            document.querySelectorAll(".w3-bar-item").forEach(el => el.classList.remove("nav-active"));
+            link.classList.add("nav-active");
+            
+            // On mobile, close sidebar after selection
+            w3_close();
+        };
+        dateDiv.appendChild(link);
+    });
+}
+
+function formatMonth(month) {
+    const d = new Date(month + "-01T00:00:00");
+    return isNaN(d) ? month : d.toLocaleString("en-US", { month: "long", year: "numeric" });
+}
+
+// Optimized image variants (written by update_site.py --images) sit next to each PNG
+function variantUrl(img, suffix) {
+    const [path, query] = img.split('?');
+    return path.replace(/\.png$/, suffix) + (query ? '?' + query : '');
+}
+
+// Markup for one plot: the grid thumbnail (or full-size WebP/AVIF) when available, PNG otherwise.
+// The full-size image is only opened on click.
+// Plots of archived dates are byte ranges of a per-month pack: <pack>?v=<hash>#<first>-<last>/<file name>
+function isPacked(url) {
+    return url.includes('#') && url.split('?')[0].endsWith('.pack');
+}
+
+function imageName(url) {
+    return url.split('/').pop().split('?')[0];
+}
+
+// Object URLs of the archived plots fetched so far, keyed by manifest URL
+const packedUrls = {};
+
+function packedObjectUrl(url) {
+    if (!packedUrls[url]) {
+        const [pack, member] = url.split('#');
+        const [first, last] = member.split('/')[0].split('-').map(Number);
+        packedUrls[url] = fetch(pack, { headers: { Range: `bytes=${first}-${last}` } })
+            .then(res => {
+                if (!res.ok) throw new Error(`HTTP ${res.status}`);
+                // A server that ignores Range sends the whole pack
+                return res.blob().then(blob => res.status === 206 ? blob : blob.slice(first, last + 1));
+            })
+            .then(blob => URL.createObjectURL(new Blob([blob], { type: 'image/png' })))
+            .catch(e => {
+                delete packedUrls[url];
+                throw e;
+            });
+    }
+    return packedUrls[url];
+}
+
+function pictureHtml(img, dateItem, alt, useThumb, style, lazy) {
+    // lazy: URLs go into data-* attributes and are swapped in by the gallery observer.
+    // Archived plots always are, since only loadLazyImage() knows how to fetch them.
+    lazy = lazy || isPacked(img);
+    const src = lazy ? 'data-src' : 'src';
+    const srcset = lazy ? 'data-srcset' : 'srcset';
+    const variants = dateItem.image_variants || [];
+    const thumb = variants.find(v => v.startsWith('.thumb'));
+    let sources = '';
+    if (useThumb && thumb) {
+        sources = `<source type="image/webp" ${srcset}="${variantUrl(img, thumb)}">`;
+    } else {
+        if (variants.includes('.avif')) sources += `<source type="image/avif" ${srcset}="${variantUrl(img, '.avif')}">`;
+        if (variants.includes('.webp')) sources += `<source type="image/webp" ${srcset}="${variantUrl(img, '.webp')}">`;
+    }
+    const full = variants.includes('.webp') ? variantUrl(img, '.webp') : img;
+    const loading = lazy ? ' loading="lazy" decoding="async"' : '';
+    return `<picture>${sources}<img ${src}="${img}" alt="${alt}" data-full="${full}"${loading}${style ? ` style="${style}"` : ''} onclick="window.open(this.dataset.full)"></picture>`;
+}
+
+// Gallery tiles hold their URLs until they come within GALLERY_ROOT_MARGIN of the viewport.
+// Tiles in a hidden tab never intersect, so an unopened gallery costs no requests.
+const GALLERY_ROOT_MARGIN = "400px 0px";
+let galleryObserver = null;
+
+function loadLazyImage(img) {
+    if (img.dataset.sheet) {
+        img.style.backgroundImage = `url("${img.dataset.sheet}")`;
+        img.removeAttribute("data-sheet");
+        return;
+    }
+    if (isPacked(img.dataset.src)) {
+        const url = img.dataset.src;
+        img.removeAttribute("data-src");
+        packedObjectUrl(url).then(objectUrl => {
+            img.src = objectUrl;
+            img.dataset.full = objectUrl;
+        }).catch(e => console.error("Failed to load archived plot", e));
+        return;
+    }
+    img.parentElement.querySelectorAll("source[data-srcset]").forEach(source => {
+        source.srcset = source.dataset.srcset;
+        source.removeAttribute("data-srcset");
+    });
+    img.src = img.dataset.src;
+    img.removeAttribute("data-src");
+}
+
+function observeLazyImages(container) {
+    const images = container.querySelectorAll("img[data-src], .sprite-tile[data-sheet]");
+    if (!("IntersectionObserver" in window)) {
+        images.forEach(loadLazyImage);
+        return;
+    }
+    if (!galleryObserver) {
+        galleryObserver = new IntersectionObserver(entries => {
+            entries.forEach(entry => {
+                if (!entry.isIntersecting) return;
+                galleryObserver.unobserve(entry.target);
+                loadLazyImage(entry.target);
+            });
+        }, { rootMargin: GALLERY_ROOT_MARGIN });
+    }
+    images.forEach(img => galleryObserver.observe(img));
+}
+
+// Contact-sheet tile (written by update_site.py --sprites): one cell of a shared sheet, drawn as a CSS background
+// scaled so the cell fills the tile. The sheet URL waits in data-sheet until the gallery observer reaches the tile.
+function spriteTileHtml(img, dateItem, cell) {
+    const sprites = dateItem.sprites;
+    const [index, column, row] = cell;
+    const sheet = sprites.sheets[index];
+    const x = sheet.columns > 1 ? column / (sheet.columns - 1) * 100 : 0;
+    const y = sheet.rows > 1 ? row / (sheet.rows - 1) * 100 : 0;
+    const variants = dateItem.image_variants || [];
+    const full = variants.includes('.webp') ? variantUrl(img, '.webp') : img;
+    const style = `aspect-ratio:${sprites.tile[0]}/${sprites.tile[1]};background-size:${sheet.columns * 100}% ${sheet.rows * 100}%;background-position:${x}% ${y}%`;
+    return `<div class="sprite-tile" role="img" aria-label="${imageName(img)}" title="${imageName(img)}" data-sheet="${sheet.url}" data-full="${full}" style="${style}" onclick="window.open(this.dataset.full)"></div>`;
+}
+
+// cells: the list's contact-sheet cells, when the date has sheets
+function renderGallery(gallery, images, dateItem, emptyMessage, cells) {
+    if (!images || images.length === 0) {
+        gallery.innerHTML = `<p>${emptyMessage}</p>`;
+        return;
+    }
+    // Build every tile off-document and attach them in one go
+    const fragment = document.createDocumentFragment();
+    images.forEach((img, i) => {
+        const div = document.createElement("div");
+        div.className = "gallery-item";
+        div.innerHTML = cells ? spriteTileHtml(img, dateItem, cells[i]) : pictureHtml(img, dateItem, imageName(img), true, null, true);
+        fragment.appendChild(div);
+    });
+    gallery.appendChild(fragment);
+    observeLazyImages(gallery);
+}
+
+// Fetch a manifest shard once and keep it for later clicks
+async function loadShard(url) {
+    if (!shardCache[url]) {
+        shardCache[url] = fetch(url).then(res => {
+            if (!res.ok) throw new Error(`HTTP ${res.status}`);
+            return res.json();
+        }).catch(e => {
+            delete shardCache[url];
+            throw e;
+        });
     }
+    return shardCache[url];
 }
 
 // Accordion
@@ -540,9 +2988,7 @@ function shareTo(platform) {
         case 'tiktok':
             // Copy to clipboard
             navigator.clipboard.writeText(url).then(function() {
-                var toast = document.getElementById("toast");
-                toast.className = "show";
-                setTimeout(function(){ toast.className = toast.className.replace("show", ""); }, 3000);
+                showToast("Link copied to clipboard!");
             }, function(err) {
                 console.error('Could not copy text: ', err);
             });
@@ -550,241 +2996,354 @@ function shareTo(platform) {
     }
 }
 
-// Helper: Format JSON Table
-function jsonToTable(data, strategyKey) {
-    if (!data || data.length === 0) return "<p>No data available.</p>";
+// Summary Renderers
+// Each strategy's summary is drawn by an ES module under js/ (written by update_site.py), imported the first time
+// the strategy is opened. The registry also lists the plot tabs each strategy shows.
+const RENDERERS = __RENDERERS__;
+// The core helpers a module's render() draws with, passed in rather than read from the page's globals
+const RENDERER_SHELL = { downloadLinkHtml, pictureHtml, observeLazyImages };
+
+// Day-over-day changes, precomputed by build_changes() in update_site.py
+function changesHtml(changes) {
+    const parts = [];
+    if (changes.signals.length) {
+        const items = changes.signals.map(c => `<b>${escapeHtml(c.ticker)}</b> ` +
+            (c.from === null ? '<span class="w3-tag w3-blue w3-small">new</span> ' : `${escapeHtml(c.from)} &rarr; `) +
+            escapeHtml(c.to === null ? '' : c.to));
+        parts.push(`<p><b>Signal changes:</b> ${items.join(', ')}</p>`);
+    }
+    if (changes.dropped.length) {
+        parts.push(`<p><b>Dropped:</b> ${changes.dropped.map(c => escapeHtml(c.ticker)).join(', ')}</p>`);
+    }
+    if (changes.moves.length) {
+        const items = changes.moves.map(m => `<b>${escapeHtml(m.ticker)}</b> ${escapeHtml(m.field)} ${m.from} &rarr; ${m.to} (${m.change > 0 ? '+' : ''}${m.change}%)`);
+        parts.push(`<p><b>Level moves:</b> ${items.join(', ')}</p>`);
+    }
+    return parts.length ? parts.join('') : '<p>No changes.</p>';
+}
+
+// Home view: the newest changes of every strategy from the rolling feed
+async function loadChangesFeed() {
+    const container = document.getElementById("changes-feed");
+    try {
+        const res = await fetch('changes.json', { cache: 'no-cache' });
+        if (!res.ok) return;
+        const feed = await res.json();
+        // The feed is newest first, so the first entry seen per strategy is its latest date
+        const latest = {};
+        feed.dates.forEach(entry => { if (!latest[entry.strategy]) latest[entry.strategy] = entry; });
+        const panels = Object.values(latest).map(entry => {
+            const name = manifest[entry.strategy] ? manifest[entry.strategy].name : entry.strategy;
+            return `<div class="w3-panel w3-white w3-card w3-left-align w3-padding">` +
+                `<h5><a href="#" data-strategy="${entry.strategy}" data-date="${entry.date}" onclick="openSearchResult(event, '${entry.strategy}', '${entry.date}')">${escapeHtml(name)} &middot; ${entry.date}</a>` +
+                ` <span class="w3-small w3-text-grey">since ${entry.previous}</span></h5>${changesHtml(entry)}</div>`;
+        });
+        if (panels.length) container.innerHTML = '<h4 class="w3-left-align">Latest changes</h4>' + panels.join('');
+    } catch (e) {
+        console.warn("Failed to load the changes feed", e);
+    }
+}
+
+// Ticker Search: one fetch of the prebuilt inverted index shard for the ticker's prefix
+function escapeHtml(text) {
+    return String(text).replace(/[&<>"']/g, c => ({ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' })[c]);
+}
+
+function searchPrefix(ticker) {
+    const prefix = ticker.charAt(0).toUpperCase();
+    return /^[A-Z0-9]$/.test(prefix) ? prefix : '_';
+}
+
+async function searchTicker(e) {
+    e.preventDefault();
+    const ticker = document.getElementById("search-input").value.trim().toUpperCase();
+    if (!ticker) return;
     
-    // Columns to exclude
-    const excluded = ["Model", "Strategy", "Best_Window", "Metric_Value", "Metric_Type", "Sentiment_Score", "timestamp"];
+    const results = document.getElementById("search-results");
+    document.getElementById("placeholder-msg").classList.add("hidden");
+    document.getElementById("dashboard-content").classList.add("hidden");
+    results.classList.remove("hidden");
+    document.getElementById("page-title").innerText = `Search - ${ticker}`;
+    results.innerHTML = '<p><i class="fa fa-spinner fa-spin"></i> Searching...</p>';
+    w3_close();
     
-        // Specific exclusion for Peak Valley (pv) strategy
-        if (strategyKey === 'pv') {
-            excluded.push("performance", "volatility");
+    try {
+        const res = await fetch(`search/${searchPrefix(ticker)}.json`, { cache: 'no-cache' });
+        const shard = res.status === 404 ? { metrics: {}, tickers: {} } : await res.json();
+        const postings = shard.tickers[ticker] || [];
+        if (postings.length === 0) {
+            results.innerHTML = `<p>No reports mention ${escapeHtml(ticker)}.</p>`;
+            return;
         }
         
-        // Get headers, filtering out excluded ones
-        const allHeaders = Object.keys(data[0]);
-        let headers = allHeaders.filter(h => !excluded.includes(h));
-        
-        // Header mapping for Peak Valley (US)
-        const pvHeaderMap = {
-            'ticker': 'Ticker',
-            'current_price': 'Current Price',
-            'rsi': 'RSI',
-            'macd': 'MACD',
-            'trend': 'Trend',
-            'mtf_trend': 'MTF Trend',
-            'adx': 'ADX',
-            'divergence': 'Divergence',
-            'stops': 'Stops',
-            'action': 'Action',
-            'reasons': 'Reasons'
-        };
-        
-        if (strategyKey === 'pv') {
-            headers = ['ticker', 'current_price', 'rsi', 'macd', 'trend', 'mtf_trend', 'adx', 'divergence', 'stops', 'action', 'reasons'];
-        }
+        let html = '<table class="analysis-table w3-table-all w3-hoverable"><thead><tr class="w3-light-grey">';
+        html += '<th>Strategy</th><th>Date</th><th>Signal</th><th class="w3-hide-small">Key Metric</th><th>Plot</th></tr></thead><tbody>';
+        postings.forEach(([strategyKey, date, signal, metric]) => {
+            const strat = manifest[strategyKey];
+            const signalClass = signal ? String(signal).split(' ')[0].replace(/[^a-zA-Z]/g, '') : '';
+            const metricText = metric === null ? '' : `${shard.metrics[strategyKey]}: ${metric.toFixed(2)}`;
+            const data = `data-strategy="${escapeHtml(strategyKey)}" data-date="${escapeHtml(date)}"`;
+            html += '<tr>';
+            html += `<td>${strat ? strat.name : escapeHtml(strategyKey)}</td>`;
+            html += `<td><a href="#" ${data}>${escapeHtml(date)}</a></td>`;
+            html += `<td>${signal ? `<span class="signal-${signalClass}">${escapeHtml(signal)}</span>` : 'Scanned'}</td>`;
+            html += `<td class="w3-hide-small">${metricText}</td>`;
+            html += `<td><a href="#" ${data} data-ticker="${escapeHtml(ticker)}"><i class="fa-solid fa-chart-line"></i></a></td>`;
+            html += '</tr>';
+        });
+        html += '</tbody></table>';
+        results.innerHTML = `<p>${postings.length} report(s) mention <b>${escapeHtml(ticker)}</b>.</p>` + html;
+    } catch(err) {
+        results.innerHTML = `<p class="w3-text-red">Error searching: ${err.message}</p>`;
+    }
+}
 
-        let html = '<table class="analysis-table w3-table-all w3-hoverable">';
-        html += '<thead><tr class="w3-light-grey">';
-        headers.forEach(h => {
-            let displayHeader = h;
-            if (strategyKey === 'pv' && pvHeaderMap[h]) {
-                displayHeader = pvHeaderMap[h];
-            } else {
-                // Replace underscores with spaces and Capitalize Each Word
-                displayHeader = h.replace(/_/g, " ").replace(/\b\w/g, l => l.toUpperCase());
-                // Specific overrides
-                if (h.toLowerCase() === 'ticker') displayHeader = "Ticker";
-                if (h.toLowerCase() === 'current_price') displayHeader = "Current Price";
-                if (h.toLowerCase() === 'rsi') displayHeader = "RSI";
-                if (h.toLowerCase() === 'macd') displayHeader = "MACD";
-                if (h.toLowerCase() === 'mtf_trend') displayHeader = "MTF Trend";
-                if (h.toLowerCase() === 'adx') displayHeader = "ADX";
-            }
-            
-            // Responsive Classes for Peak Valley
-            let classList = "";
-            if (strategyKey === 'pv') {
-                const alwaysVisible = ['ticker', 'current_price', 'stops', 'action'];
-                if (!alwaysVisible.includes(h.toLowerCase())) {
-                    classList = "class='w3-hide-small'";
-                }
-            }
-            
-            html += `<th ${classList}>${displayHeader}</th>`;
+// Result links carry their report in data attributes and one listener opens them, so the searched text
+// never becomes handler source
+function watchSearchResults() {
+    document.getElementById("search-results").addEventListener("click", e => {
+        const link = e.target.closest("a[data-date]");
+        if (!link) return;
+        const { strategy, date, ticker } = link.dataset;
+        if (ticker) openTickerPlot(e, strategy, date, ticker);
+        else openSearchResult(e, strategy, date);
+    });
+}
+
+function findMonth(strategyKey, date) {
+    const strat = manifest[strategyKey];
+    return strat && strat.months.find(m => m.month === date.slice(0, 7));
+}
+
+function openSearchResult(e, strategyKey, date) {
+    e.preventDefault();
+    const monthInfo = findMonth(strategyKey, date);
+    if (monthInfo) loadReport(strategyKey, monthInfo, date);
+}
+
+// Plot file names embed the ticker: forward_test_AAPL.png, AAPL_backtest.png, AAPL_livetest.png
+async function openTickerPlot(e, strategyKey, date, ticker) {
+    e.preventDefault();
+    const monthInfo = findMonth(strategyKey, date);
+    if (!monthInfo) return;
+    const shard = await loadShard(monthInfo.shard);
+    const dateItem = shard.dates.find(item => item.date === date);
+    const escaped = ticker.replace(/[.*+?^${}()|[\\]\\\\]/g, '\\\\$&');
+    const pattern = new RegExp(`(^|_)${escaped}(_[a-z]+)?\\\\.png$`);
+    const images = dateItem ? [...dateItem.forward_images, ...dateItem.backward_images, ...dateItem.output_images] : [];
+    const plot = images.find(img => pattern.test(imageName(img)));
+    if (!plot) {
+        showToast(`No plot found for ${ticker} on ${date}`);
+    } else if (isPacked(plot)) {
+        // Open the window inside the click so it is not blocked, then point it at the unpacked plot
+        const win = window.open("", "_blank");
+        packedObjectUrl(plot).then(url => { win.location = url; }).catch(() => win.close());
+    } else {
+        window.open(plot);
+    }
+}
+
+function showToast(message) {
+    const toast = document.getElementById("toast");
+    toast.innerText = message;
+    toast.className = "show";
+    setTimeout(function(){ toast.className = toast.className.replace("show", ""); }, 3000);
+}
+
+// Raw data stays available as a download next to the pre-rendered table
+function downloadLinkHtml(dateItem) {
+    if (!dateItem.output_file) return '';
+    return `<p class="w3-right-align w3-small"><a href="${dateItem.output_file}" download="output.json"><i class="fa-solid fa-download"></i> Download data</a></p>`;
+}
+
+// Prefetching: a date's data is warmed when its link is hovered, focused or touched, and for the dates either
+// side of the report on screen. Nothing is prefetched when the browser asks to save data or is on 2G, and at
+// most PREFETCH_CONCURRENCY prefetch requests run at once so they never crowd out the report being opened.
+const PREFETCH_CONCURRENCY = 2;
+const PREFETCH_HOVER_DELAY = 80; // ms a pointer rests on a link before it counts as intent
+const PREFETCH_THUMBNAILS = 8;   // Leading gallery thumbnails warmed per tab
+const REPORT_TEXT_CACHE = 24;    // Fetched fragments, reports and change lists kept in memory
+// URL -> promise of the response text, shared by prefetches and loadReport so an in-flight prefetch is reused
+const reportTexts = new Map();
+const prefetchQueue = [];
+const prefetchedReports = new Set();
+let prefetchActive = 0;
+
+function fetchText(url, priority) {
+    let text = reportTexts.get(url);
+    if (!text) {
+        text = fetch(url, { priority: priority || 'auto' }).then(res => {
+            if (!res.ok) throw new Error(`HTTP ${res.status}`);
+            return res.text();
         });
-        html += '</tr></thead><tbody>';
-        
-        data.forEach(row => {
-            html += '<tr>';
-            headers.forEach(h => {
-                let val = row[h];
-                
-                // Responsive Classes for Peak Valley (Data Cells)
-                let classList = "";
-                if (strategyKey === 'pv') {
-                    const alwaysVisible = ['ticker', 'current_price', 'stops', 'action'];
-                    if (!alwaysVisible.includes(h.toLowerCase())) {
-                        classList = "class='w3-hide-small'";
-                    }
-                }
-                
-                // Handle RSI object: show status only
-                if (h.toLowerCase() === 'rsi' && val && typeof val === 'object' && val.status) {
-                    val = val.status;
-                }
-                
-                // Handle MACD object: show crossover only
-                if (h.toLowerCase() === 'macd' && val && typeof val === 'object' && val.crossover) {
-                    val = val.crossover;
-                }
-                
-                // Handle Trend/MTF Trend object: show status only
-                if ((h.toLowerCase() === 'trend' || h.toLowerCase() === 'mtf_trend') && val && typeof val === 'object' && val.status) {
-                    val = val.status;
-                }
-                
-                // Handle ADX object: show status only
-                if (h.toLowerCase() === 'adx' && val && typeof val === 'object' && val.status) {
-                    val = val.status;
-                }
-            
-            // Handle Divergence object
-            if (h.toLowerCase() === 'divergence' && val && typeof val === 'object') {
-                if (val.bullish) val = "Bullish";
-                else if (val.bearish) val = "Bearish";
-                else val = "None";
-            }
-            
-            // Handle Stops object
-            if (h.toLowerCase() === 'stops' && val && typeof val === 'object') {
-                const sl = val.stop_loss ? val.stop_loss.toFixed(2) : 'N/A';
-                const tp = val.take_profit ? val.take_profit.toFixed(2) : 'N/A';
-                const slPct = val.stop_loss_pct ? `(${val.stop_loss_pct.toFixed(0)})` : '';
-                const tpPct = val.take_profit_pct ? `(${val.take_profit_pct.toFixed(0)})` : '';
-                val = `SL ${slPct}: ${sl} | TP ${tpPct}: ${tp}`;
-            }
-            
-            // Handle Arrays (e.g. Reasons): Join with comma
-            if (Array.isArray(val)) {
-                val = val.join(', ');
-            }
+        text.catch(() => { if (reportTexts.get(url) === text) reportTexts.delete(url); });
+        reportTexts.set(url, text);
+        if (reportTexts.size > REPORT_TEXT_CACHE) reportTexts.delete(reportTexts.keys().next().value);
+    }
+    return text;
+}
 
-            // Handle Signal coloring (generic)
-            if (h === 'Signal' && val) {
-                val = `<span class="signal-${val}">${val}</span>`;
-            }
-            // Handle Action coloring for PV
-            if (strategyKey === 'pv' && h.toLowerCase() === 'action' && val) {
-                const signalClass = val.split(' ')[0].replace(/[^a-zA-Z]/g, ''); // Extract BUY from BUY (VOL BLOCKED)
-                val = `<span class="signal-${signalClass}">${val}</span>`;
-            }
-            if (val === null || val === undefined) val = "";
-            
-            // Check if object (and not handled above)
-            if (typeof val === 'object') {
-                val = JSON.stringify(val); // Fallback to avoid [object Object]
-            }
+function prefetchAllowed() {
+    const connection = navigator.connection;
+    return !(connection && (connection.saveData || (connection.effectiveType || '').endsWith('2g')));
+}
 
-            // Format numbers
-            if (typeof val === 'number') {
-                val = val.toFixed(2);
-            }
-            
-            html += `<td ${classList}>${val}</td>`;
+// Tasks return a promise; urgent ones (pointer intent) go ahead of the adjacent-date warm-up
+function queuePrefetch(tasks, urgent) {
+    if (urgent) prefetchQueue.unshift(...tasks);
+    else prefetchQueue.push(...tasks);
+    runPrefetches();
+}
+
+function runPrefetches() {
+    while (prefetchActive < PREFETCH_CONCURRENCY && prefetchQueue.length) {
+        const task = prefetchQueue.shift();
+        prefetchActive++;
+        task().catch(() => {}).finally(() => {
+            prefetchActive--;
+            runPrefetches();
         });
-        html += '</tr>';
+    }
+}
+
+// Leading gallery tiles of the tabs the strategy shows: their contact sheets (update_site.py --sprites) or
+// grid thumbnails (--images); archived plots are skipped
+function thumbnailUrls(strategyKey, dateItem) {
+    const thumb = (dateItem.image_variants || []).find(v => v.startsWith('.thumb'));
+    return [...new Set(RENDERERS[strategyKey].tabs.flatMap(tab => {
+        const name = `${tab.toLowerCase()}_images`;
+        const cells = dateItem.sprites && dateItem.sprites[name];
+        if (cells) return cells.slice(0, PREFETCH_THUMBNAILS).map(cell => dateItem.sprites.sheets[cell[0]].url);
+        if (!thumb) return [];
+        return (dateItem[name] || []).filter(img => !isPacked(img)).slice(0, PREFETCH_THUMBNAILS).map(img => variantUrl(img, thumb));
+    }))];
+}
+
+function prefetchReport(strategyKey, date, urgent) {
+    const key = `${strategyKey}/${date}`;
+    const monthInfo = findMonth(strategyKey, date);
+    if (!monthInfo || key === currentReport || prefetchedReports.has(key) || !prefetchAllowed()) return;
+    prefetchedReports.add(key);
+    queuePrefetch([async () => {
+        const shard = await loadShard(monthInfo.shard);
+        const dateItem = shard.dates.find(item => item.date === date);
+        if (!dateItem) return;
+        import(RENDERERS[strategyKey].module).catch(() => {});
+        // What loadReport fetches first stays in memory; thumbnails only need to reach the HTTP and service worker caches
+        const texts = [dateItem.summary_file || dateItem.output_file, dateItem.changes_file].filter(Boolean);
+        queuePrefetch([
+            ...texts.map(url => () => fetchText(url, 'low')),
+            ...thumbnailUrls(strategyKey, dateItem).map(url => () => fetch(url, { priority: 'low' }).then(res => res.blob()))
+        ], urgent);
+    }], urgent);
+}
+
+// The dates just before and after the one on screen, in sidebar order
+function prefetchAdjacent(strategyKey, date) {
+    const dates = manifest[strategyKey].months.flatMap(monthInfo => monthInfo.dates);
+    const i = dates.indexOf(date);
+    if (i < 0) return;
+    if (i > 0) prefetchReport(strategyKey, dates[i - 1]);
+    if (i < dates.length - 1) prefetchReport(strategyKey, dates[i + 1]);
+}
+
+// Date links anywhere on the page (sidebar, changes feed, search results) carry data-strategy and data-date
+function watchPrefetchIntent() {
+    let timer = null;
+    const dateLink = e => e.target.closest && e.target.closest("a[data-date]");
+    document.addEventListener("mouseover", e => {
+        const link = dateLink(e);
+        clearTimeout(timer);
+        if (link) timer = setTimeout(() => prefetchReport(link.dataset.strategy, link.dataset.date, true), PREFETCH_HOVER_DELAY);
     });
-    
-    html += '</tbody></table>';
-    return html;
+    document.addEventListener("mouseout", () => clearTimeout(timer));
+    for (const type of ["focusin", "touchstart"]) {
+        document.addEventListener(type, e => {
+            const link = dateLink(e);
+            if (link) prefetchReport(link.dataset.strategy, link.dataset.date, true);
+        }, { passive: true });
+    }
 }
 
 // Load Content
-async function loadReport(strategyKey, dateItem) {
+async function loadReport(strategyKey, monthInfo, date) {
     const strat = manifest[strategyKey];
+    // A report opened while this one loads takes over: each await below is followed by a check of currentReport
+    const reportKey = `${strategyKey}/${date}`;
+    currentReport = reportKey;
     
     // UI Updates
     document.getElementById("placeholder-msg").classList.add("hidden");
+    document.getElementById("search-results").classList.add("hidden");
     document.getElementById("dashboard-content").classList.remove("hidden");
-    document.getElementById("page-title").innerText = `${strat.name} - ${dateItem.date}`;
+    document.getElementById("page-title").innerText = `${strat.name} - ${date}`;
     document.getElementById("strategy-desc").innerHTML = strat.description;
     
+    // Only the shard for this strategy/month is needed
+    const summaryDiv = document.getElementById("Summary");
+    let dateItem;
+    try {
+        const shard = await loadShard(monthInfo.shard);
+        if (currentReport !== reportKey) return;
+        dateItem = shard.dates.find(item => item.date === date);
+        if (!dateItem) throw new Error(`No entry for ${date}`);
+    } catch(e) {
+        if (currentReport !== reportKey) return;
+        summaryDiv.innerHTML = `<p class="w3-text-red">Error loading report index: ${e.message}</p>`;
+        return;
+    }
+    
     // Toggle Tabs
-    const btnForward = document.getElementById("btn-forward");
-    const btnBackward = document.getElementById("btn-backward");
-
-    if (strategyKey === 'pv') {
-        btnForward.style.display = 'block';
-        btnBackward.style.display = 'block';
-    } else if (strategyKey === 'm') {
-        btnForward.style.display = 'none';
-        btnBackward.style.display = 'block';
-    } else {
-        btnForward.style.display = 'block';
-        btnBackward.style.display = 'none';
+    const renderer = RENDERERS[strategyKey];
+    for (const tab of ['Forward', 'Backward']) {
+        document.getElementById(`btn-${tab.toLowerCase()}`).style.display = renderer.tabs.includes(tab) ? 'block' : 'none';
     }
     
+    // Changes since the previous date come from a small precomputed file, ahead of the full tables
+    const changesPanel = document.getElementById("changes-panel");
+    changesPanel.classList.add("hidden");
+    if (dateItem.changes_file) {
+        fetchText(dateItem.changes_file).then(JSON.parse).then(changes => {
+            if (currentReport !== reportKey) return;  // Another report was opened meanwhile
+            changesPanel.innerHTML = `<h5>Changes since ${changes.previous}</h5>` + changesHtml(changes);
+            changesPanel.classList.remove("hidden");
+        }).catch(e => console.warn("Failed to load changes", e));
+    }
+
+    // Drop pending image loads from the previous report before its tiles are replaced
+    if (galleryObserver) galleryObserver.disconnect();
+
     // 1. Load Summary
-    const summaryDiv = document.getElementById("Summary");
-    if (dateItem.has_output && dateItem.output_file) {
+    if (dateItem.summary_file) {
+        // Pre-rendered at build time: one small fetch, one innerHTML assignment
         summaryDiv.innerHTML = '<p><i class="fa fa-spinner fa-spin"></i> Loading table...</p>';
+        const rendererModule = import(renderer.module);  // Fetched alongside the fragment
         try {
-            const res = await fetch(dateItem.output_file + '?v=' + new Date().getTime());
-            const text = await res.text();
-            const cleanText = text.replace(/:\\s*NaN\\b/g, ': null')
-                                  .replace(/:\\s*Infinity\\b/g, ': null')
-                                  .replace(/:\\s*-Infinity\\b/g, ': null');
-            const json = JSON.parse(cleanText);
-            
-            if (strategyKey === 'm') {
-                let mHtml = "";
-                
-                const scanSummaryImg = dateItem.output_images && dateItem.output_images.find(img => img.includes("scan_results_summary.png"));
-                const histSummaryImg = dateItem.output_images && dateItem.output_images.find(img => img.includes("historical_context_summary.png"));
-                
-                if (scanSummaryImg || histSummaryImg) {
-                    mHtml += '<div class="gallery-grid">';
-                    if (scanSummaryImg) mHtml += `<div class="gallery-item"><img src="${scanSummaryImg}" alt="Scan Results Summary" onclick="window.open(this.src)"></div>`;
-                    if (histSummaryImg) mHtml += `<div class="gallery-item"><img src="${histSummaryImg}" alt="Historical Context Summary" onclick="window.open(this.src)"></div>`;
-                    mHtml += '</div><hr>';
-                }
-                
-                const scanResults = json.scan_results || [];
-                const histContext = json.historical_context || {};
-                
-                if (scanResults.length > 0) {
-                    mHtml += '<h3>Ticker Data</h3>';
-                    scanResults.forEach(item => {
-                        const ticker = item.Ticker;
-                        mHtml += `<div class="w3-card w3-margin-bottom w3-padding">`;
-                        mHtml += `<h4><b>${ticker}</b></h4>`;
-                        mHtml += '<div class="w3-row-padding">';
-                        mHtml += '<div class="w3-twothird" style="overflow-x:auto;">';
-                        const tickerHist = histContext[ticker] || {};
-                        const mergedData = { ...item, ...tickerHist };
-                        mHtml += jsonToTable([mergedData], strategyKey);
-                        mHtml += '</div>';
-                        mHtml += '<div class="w3-third">';
-                        const livetestImg = dateItem.output_images && dateItem.output_images.find(img => img.includes(`${ticker}_livetest.png`));
-                        if (livetestImg) {
-                            mHtml += `<div class="gallery-item"><img src="${livetestImg}" alt="${ticker} Livetest" style="max-width:100%" onclick="window.open(this.src)"></div>`;
-                        } else {
-                            mHtml += `<p>No plot available for ${ticker}.</p>`;
-                        }
-                        mHtml += '</div></div></div>';
-                    });
-                } else {
-                    mHtml += "<p>No data found.</p>";
-                }
-                summaryDiv.innerHTML = mHtml;
-            } else {
-                // Handle array or single dict wrap
-                const data = Array.isArray(json) ? json : [json];
-                summaryDiv.innerHTML = jsonToTable(data, strategyKey);
-            }
+            const fragment = await fetchText(dateItem.summary_file);
+            if (currentReport !== reportKey) return;
+            summaryDiv.innerHTML = downloadLinkHtml(dateItem) + fragment;
+            observeLazyImages(summaryDiv);
+            // Sorting and filtering attach once the module is in; the table can be read before that
+            rendererModule.then(module => {
+                if (module.enhance && currentReport === reportKey) module.enhance(summaryDiv, dateItem);
+            });
+        } catch(e) {
+            if (currentReport !== reportKey) return;
+            summaryDiv.innerHTML = `<p class="w3-text-red">Error loading output data: ${e.message}</p>`;
+        }
+        rendererModule.catch(e => console.warn("Failed to load the summary renderer", e));
+    } else if (dateItem.has_output && dateItem.output_file) {
+        summaryDiv.innerHTML = '<p><i class="fa fa-spinner fa-spin"></i> Loading table...</p>';
+        try {
+            // output_file is normalized to strict JSON at build time
+            const [module, json] = await Promise.all([
+                import(renderer.module),
+                fetchText(dateItem.output_file).then(JSON.parse)
+            ]);
+            if (currentReport !== reportKey) return;
+            module.render(summaryDiv, json, dateItem, RENDERER_SHELL);
         } catch(e) {
+            if (currentReport !== reportKey) return;
             summaryDiv.innerHTML = `<p class="w3-text-red">Error loading output data: ${e.message}</p>`;
         }
     } else {
@@ -796,54 +3355,349 @@ async function loadReport(strategyKey, dateItem) {
     galleryForward.innerHTML = "";
     const galleryBackward = document.getElementById("gallery-backward");
     galleryBackward.innerHTML = "";
-    
-    // Load Backward Images (Always check)
-    if (dateItem.backward_images && dateItem.backward_images.length > 0) {
-        dateItem.backward_images.forEach(img => {
-            const div = document.createElement("div");
-            div.className = "gallery-item";
-            // Get filename
-            const imgName = img.split('/').pop();
-            div.innerHTML = `<img src="${img}" alt="${imgName}" onclick="window.open(this.src)">`;
-            galleryBackward.appendChild(div);
-        });
-    } else {
-            galleryBackward.innerHTML = "<p>No backward testing plots found.</p>";
-    }
 
-    // Load Forward Images (Always check)
-    if (dateItem.forward_images && dateItem.forward_images.length > 0) {
-        dateItem.forward_images.forEach(img => {
-            const div = document.createElement("div");
-            div.className = "gallery-item";
-            const imgName = img.split('/').pop();
-            div.innerHTML = `<img src="${img}" alt="${imgName}" onclick="window.open(this.src)">`;
-            galleryForward.appendChild(div);
-        });
-    } else {
-        galleryForward.innerHTML = "<p>No forward testing plots found.</p>";
-    }
-    
+    const sprites = dateItem.sprites || {};
+    renderGallery(galleryBackward, dateItem.backward_images, dateItem, "No backward testing plots found.", sprites.backward_images);
+    renderGallery(galleryForward, dateItem.forward_images, dateItem, "No forward testing plots found.", sprites.forward_images);
+
     // Reset to Summary Tab
     openTab(null, 'Summary');
     // Set active tab color manually since we passed null event
     document.querySelectorAll(".tablink").forEach(el => el.classList.remove("w3-red"));
     document.querySelector(".tablink").classList.add("w3-red"); 
+    
+    // Stepping to a neighbouring date should not wait on the network
+    prefetchAdjacent(strategyKey, date);
 }
 </script>
 </body>
 </html>
 """
-    with open("index.html", "w") as f:
-        f.write(html_content)
+    html_content = html_content.replace("__RENDERERS__", json.dumps(generate_renderer_modules()))
+    scripts = []
+    for name in sorted(os.listdir(RENDERER_DIR)):
+        if name.endswith(".js"):
+            with open(os.path.join(RENDERER_DIR, name)) as f:
+                scripts.append(f.read())
+    html_content = inline_styles(html_content, vendor_styles, scripts)
+    write_output("index.html", html_content)
     print("Generated index.html")
+    generate_service_worker(html_content)
+
+def watched_date_key(path):
+    """Maps a changed path to the "strategy/date" folder it belongs to, or None if it is not a build input"""
+    parts = os.path.relpath(path, ROOT_DIR).split(os.sep)
+    if len(parts) < 2 or parts[0] not in STRATEGIES:
+        return None
+    key = f"{parts[0]}/{parts[1]}"
+    if len(parts) == 2 or (len(parts) == 3 and parts[2] in DATE_SUBFOLDERS):
+        return key
+    # Only the inputs: the build's own outputs (output.min.json, summary.html, variants, *.tmp) are ignored
+    if len(parts) == 4 and parts[2] in DATE_SUBFOLDERS and (parts[3] == "output.json" or parts[3].endswith(".png")):
+        return key
+    return None
+
+class InotifyWatcher:
+    """Reports changed paths under the strategy folders using Linux inotify through ctypes
+    Raises OSError where inotify is not available"""
+    IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO = 0x2, 0x8, 0x40, 0x80
+    IN_CREATE, IN_DELETE, IN_ISDIR = 0x100, 0x200, 0x40000000
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        self.add_watch(ROOT_DIR)  # New strategy folders
+        for strategy in STRATEGIES:
+            self.add_tree(os.path.join(ROOT_DIR, strategy))
+
+    def add_watch(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd >= 0:
+            self.watches[wd] = path
+
+    def add_tree(self, path):
+        """Watches a folder and everything below it; returns the paths found, which may predate the watch"""
+        found = []
+        for dirpath, dirnames, filenames in os.walk(path):
+            self.add_watch(dirpath)
+            found.append(dirpath)
+            found += [os.path.join(dirpath, name) for name in filenames]
+        return found
+
+    def read(self, timeout):
+        """Waits up to timeout seconds (None: indefinitely) and returns the paths changed meanwhile"""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        changed = []
+        buffer = os.read(self.fd, 1 << 16)
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = self.EVENT.unpack_from(buffer, offset)
+            name = buffer[offset + self.EVENT.size:offset + self.EVENT.size + length].rstrip(b"\0")
+            offset += self.EVENT.size + length
+            if wd not in self.watches:
+                continue
+            path = os.path.join(self.watches[wd], os.fsdecode(name))
+            changed.append(path)
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                changed += self.add_tree(path)
+        return changed
+
+class PollingWatcher:
+    """Reports changed paths under the strategy folders by comparing stat snapshots"""
+
+    def __init__(self, interval=WATCH_POLL_INTERVAL):
+        self.interval = interval
+        self.snapshot = self.take_snapshot()
+
+    def take_snapshot(self):
+        snapshot = {}
+        for strategy in STRATEGIES:
+            for dirpath, _, filenames in os.walk(os.path.join(ROOT_DIR, strategy)):
+                snapshot[dirpath] = None
+                for name in filenames:
+                    if name == "output.json" or name.endswith(".png"):
+                        path = os.path.join(dirpath, name)
+                        try:
+                            st = os.stat(path)
+                        except FileNotFoundError:
+                            continue
+                        snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def read(self, timeout):
+        """Sleeps for the poll interval (or timeout, if shorter) and returns the paths changed meanwhile"""
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        snapshot = self.take_snapshot()
+        changed = [path for path in snapshot.keys() | self.snapshot.keys() if snapshot.get(path, 0) != self.snapshot.get(path, 0)]
+        self.snapshot = snapshot
+        return changed
+
+def wait_for_changes(watcher):
+    """Blocks until build inputs change and the burst of writes settles; returns the touched date keys"""
+    dirty = set()
+    while not dirty:
+        dirty.update(filter(None, map(watched_date_key, watcher.read(None))))
+    deadline = time.monotonic() + WATCH_MAX_DELAY
+    while time.monotonic() < deadline:
+        changed = watcher.read(WATCH_DEBOUNCE)
+        if not changed:
+            break
+        dirty.update(filter(None, map(watched_date_key, changed)))
+    return dirty
+
+class ReloadChannel:
+    """Counts finished rebuilds and wakes the preview pages waiting on them"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.generation = 0
+
+    def notify(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, seen, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != seen, timeout)
+            return self.generation
+
+class PreviewHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves the site with a live-reload hook added to every HTML page"""
+    reloads = None
+    snippet = f'<script>new EventSource("{RELOAD_PATH}").onmessage = () => location.reload();</script>'
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == RELOAD_PATH:
+            self.stream_reloads()
+        elif path == f"/{SERVICE_WORKER_FILE}":
+            # Without the service worker a reload always shows the freshly built manifest
+            self.send_error(404, "The service worker is disabled in preview")
+        else:
+            # translate_path() unquotes the URL and drops ".." segments, keeping the page under the site root
+            target = self.translate_path(self.path)
+            if path.endswith("/") and os.path.isfile(os.path.join(target, "index.html")):
+                target = os.path.join(target, "index.html")
+            if target.endswith(".html"):
+                self.send_page(target)
+            else:
+                super().do_GET()
+
+    def send_page(self, path):
+        root = os.path.realpath(self.directory)
+        if os.path.commonpath([root, os.path.realpath(path)]) != root:
+            self.send_error(404)
+            return
+        try:
+            with open(path, "rb") as f:
+                body = f.read().replace(b"</body>", self.snippet.encode() + b"</body>", 1)
+        except OSError:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_reloads(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        seen = self.reloads.generation
+        try:
+            while True:
+                generation = self.reloads.wait(seen, timeout=15)
+                # A comment line doubles as a keep-alive that notices closed tabs
+                self.wfile.write(b"data: reload\n\n" if generation != seen else b": ping\n\n")
+                self.wfile.flush()
+                seen = generation
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_preview(port, reloads):
+    """Starts the preview server on a background thread"""
+    handler = functools.partial(PreviewHandler, directory=ROOT_DIR)
+    PreviewHandler.reloads = reloads
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving the site at http://127.0.0.1:{port}/ (pages reload after each rebuild)")
+    return server
+
+def watch_site(args):
+    """Builds once, then rebuilds the touched dates whenever the strategy folders change"""
+    build_site(args)
+    reloads = ReloadChannel()
+    if args.serve is not None:
+        serve_preview(args.serve, reloads)
+    watcher = None
+    if not args.poll:
+        try:
+            watcher = InotifyWatcher()
+        except OSError as e:
+            print(f"inotify unavailable ({e}), falling back to polling")
+    if watcher is None:
+        watcher = PollingWatcher()
+    print(f"Watching {', '.join(STRATEGIES)} for changes (Ctrl+C to stop)")
+    try:
+        while True:
+            dirty = wait_for_changes(watcher)
+            print(f"Changes in {', '.join(sorted(dirty))}")
+            build_site(args, dirty)
+            reloads.notify()
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+def manifest_stages(dedupe=False, dedupe_links=False, images=False, avif=False, image_workers=None,
+                    archive_after=None, prune_archived=False, sprites=False):
+    """Returns the manifest stages a build runs, in order; the defaults give those of a build without options"""
+    stages = [functools.partial(dedupe_images, link=dedupe_links) if dedupe else restore_date_images]
+    if images:
+        stages.append(functools.partial(optimize_images, avif=avif, workers=image_workers))
+    stages.append(functools.partial(archive_images, days=archive_after))
+    if prune_archived:
+        stages.append(prune_archived_plots)
+    stages.append(functools.partial(build_sprites, workers=image_workers) if sprites else drop_sprites)
+    stages.append(normalize_outputs)
+    stages.append(render_summary_fragments)
+    stages.append(ingest_outputs)
+    stages.append(build_changes)
+    stages.append(build_history)
+    stages.append(build_search_index)
+    return stages
+
+def build_site(args, dirty=None):
+    """Runs the build; with dirty (from watch mode) only those dates and the outputs depending on them"""
+    OUTPUT_STATS.clear()
+    if args.profile:
+        PROFILER.start()
+    stages = manifest_stages(dedupe=args.dedupe, dedupe_links=args.dedupe_links, images=args.images, avif=args.avif,
+                             image_workers=args.image_workers, archive_after=args.archive_after,
+                             prune_archived=args.prune_archived, sprites=args.sprites)
 
-def main():
     print("Starting site update...")
-    generate_manifest()
-    generate_legal_pages()
-    generate_app_shell()
+    manifest = generate_manifest(use_cache=not args.full_rebuild or dirty is not None, threads=args.threads,
+                                 stages=stages, dirty=dirty)
+    if dirty is None:
+        # The shell, legal pages and headers do not depend on the data, so rebuilds in watch mode skip them
+        with PROFILER.phase("generate_cache_headers"):
+            generate_cache_headers()
+        with PROFILER.phase("generate_legal_pages"):
+            vendor_styles = load_vendor_styles()
+            generate_legal_pages(vendor_styles)
+        with PROFILER.phase("generate_app_shell"):
+            generate_app_shell(vendor_styles)
+    if args.precompress:
+        with PROFILER.phase("precompress_assets"):
+            precompress_assets(manifest)
+    print(f"Outputs: {OUTPUT_STATS['written']} written ({OUTPUT_STATS['bytes']:,} bytes), "
+          f"{OUTPUT_STATS['skipped']} unchanged and skipped")
+    if args.profile:
+        PROFILER.report()
     print("Site update complete.")
 
+def main():
+    parser = argparse.ArgumentParser(description="Regenerates the stock analysis dashboard")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help=f"ignore {BUILD_CACHE_FILE} and rescan every date folder")
+    parser.add_argument("--threads", type=int, default=SCAN_THREADS,
+                        help=f"worker threads for directory scanning (default: {SCAN_THREADS})")
+    parser.add_argument("--images", action="store_true",
+                        help="write WebP versions and grid thumbnails of every plot (requires Pillow)")
+    parser.add_argument("--avif", action="store_true",
+                        help="with --images, also write AVIF versions")
+    parser.add_argument("--image-workers", type=int, default=None,
+                        help="processes used for image optimization and contact sheets (default: CPU count)")
+    parser.add_argument("--sprites", action="store_true",
+                        help=f"tile each date's gallery plots into contact sheets under {SPRITE_DIR}/ (requires Pillow)")
+    parser.add_argument("--dedupe", action="store_true",
+                        help=f"store each distinct plot once under {BLOB_DIR}/ and point the manifest at it")
+    parser.add_argument("--dedupe-links", action="store_true",
+                        help="with --dedupe, also replace per-date copies with read-only symlinks to their blob")
+    parser.add_argument("--archive-after", type=int, metavar="DAYS", default=None,
+                        help=f"pack plots of dates older than DAYS into per-month packs under {PACK_DIR}/")
+    parser.add_argument("--prune-archived", action="store_true",
+                        help="delete loose plots (and their variants) whose content an archival pack already holds")
+    parser.add_argument("--precompress", action="store_true",
+                        help="write maximum-level .gz (and .br, if brotli is installed) sidecars for text assets")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and rebuild the dates that change under the strategy folders")
+    parser.add_argument("--poll", action="store_true",
+                        help="with --watch, poll for changes instead of using inotify")
+    parser.add_argument("--serve", type=int, nargs="?", const=PREVIEW_PORT, default=None, metavar="PORT",
+                        help=f"watch, and serve the site locally with live reload (default port: {PREVIEW_PORT})")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"record per-phase timings and file-system activity in {BUILD_METRICS_FILE}")
+    parser.add_argument("--cprofile", metavar="FILE",
+                        help="also write a cProfile dump of the build to FILE (view with python -m pstats)")
+    args = parser.parse_args()
+    if args.dedupe and args.archive_after is not None:
+        parser.error("--dedupe and --archive-after cannot be combined")
+
+    if args.watch or args.serve is not None:
+        watch_site(args)
+    elif args.cprofile:
+        profile = cProfile.Profile()
+        profile.runcall(build_site, args)
+        profile.dump_stats(args.cprofile)
+        print(f"Wrote cProfile stats to {args.cprofile}")
+    else:
+        build_site(args)
+
 if __name__ == "__main__":
     main()